@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Benchmark `get_json` with and without a pooled keep-alive session.
+
+Starts the local GitHub API stub (`stub_server.StubGitHubServer`) and
+reports requests/sec for a fresh connection per call (`requests.get`)
+against the shared pooled session used by `get_json`.
+
+Usage: ./bench_get_json.py [requests]
+"""
+import sys
+import time
+from typing import Callable
+
+import requests
+
+from stub_server import StubGitHubServer
+from utils import get_json, make_session
+
+
+def measure(fetch: Callable[[str], object], url: str, n: int) -> float:
+    """Return requests/sec for ``n`` sequential calls of ``fetch``"""
+    start = time.perf_counter()
+    for _ in range(n):
+        fetch(url)
+    return n / (time.perf_counter() - start)
+
+
+def main(n: int = 500) -> None:
+    """Run both variants against a local stub server"""
+    session = make_session()
+    with StubGitHubServer(etag=False) as stub:
+        url = stub.url + "/orgs/google"
+        try:
+            before = measure(lambda u: requests.get(u).json(), url, n)
+            after = measure(lambda u: get_json(u, session=session), url, n)
+        finally:
+            session.close()
+    print("requests.get (new connection): {:8.1f} req/s".format(before))
+    print("pooled session (keep-alive):   {:8.1f} req/s".format(after))
+    print("speedup: {:.2f}x".format(after / before))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark decoding repos listings with `get_json`.
+
+Every installed JSON backend decodes the `fixtures.TEST_PAYLOAD` org and
+repos payloads. Then a synthetic listing of about the requested size
+(50 MB by default) generated by `synthetic.write_repos` is served
+from memory and decoded in full and projected onto
+`GithubOrgClient.REPO_FIELDS`, reporting wall time and peak memory.
+
+Usage: ./bench_json.py [megabytes]
+"""
+import io
+import json
+import sys
+import time
+import timeit
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from requests import Response
+
+from client import GithubOrgClient
+from fixtures import TEST_PAYLOAD
+from synthetic import write_repos
+from utils import JSON_BACKENDS, get_json, set_json_backend
+
+
+class StubSession:
+    """Serve one in-memory body for every GET"""
+
+    def __init__(self, body: bytes) -> None:
+        """Init method of StubSession"""
+        self.body = body
+
+    def get(self, url: str, **kwargs) -> Response:
+        """Answer with the stub body"""
+        response = Response()
+        response.status_code = 200
+        response._content = self.body
+        response._content_consumed = True
+        return response
+
+
+def synthetic_listing(megabytes: float) -> bytes:
+    """A `synthetic.write_repos` listing of about ``megabytes`` of JSON"""
+    template = TEST_PAYLOAD[0][1]
+    repo_size = len(json.dumps(template).encode()) / len(template)
+    out = io.StringIO()
+    write_repos(out, int(megabytes * 2 ** 20 / repo_size))
+    return out.getvalue().encode()
+
+
+def measure(decode: Callable[[], Any]) -> Tuple[float, int]:
+    """Return the seconds and peak bytes allocated by ``decode``"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    decode()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def compare_backends() -> None:
+    """Time `get_json` on the fixture payloads with every backend"""
+    for name, payload in (("org", TEST_PAYLOAD[0][0]),
+                          ("repos", TEST_PAYLOAD[0][1])):
+        session = StubSession(json.dumps(payload).encode())
+        print("{} payload: {} bytes".format(name, len(session.body)))
+        for backend in JSON_BACKENDS:
+            set_json_backend(backend)
+            runs, total = timeit.Timer(
+                lambda: get_json("stub", session)).autorange()
+            print("  {:8} {:8.1f} us/call".format(
+                backend + ":", total / runs * 1e6))
+    set_json_backend(next(iter(JSON_BACKENDS)))
+
+
+def main(megabytes: float = 50) -> None:
+    """Compare backends, then decode the synthetic listing both ways"""
+    compare_backends()
+    session = StubSession(synthetic_listing(megabytes))
+    print("listing: {:.1f} MiB".format(len(session.body) / 2 ** 20))
+    fields = GithubOrgClient.REPO_FIELDS
+    for label, decode in (
+        ("full decode", lambda: get_json("stub", session)),
+        ("projected decode", lambda: get_json("stub", session,
+                                              fields=fields)),
+    ):
+        elapsed, peak = measure(decode)
+        print("{:17} {:6.2f}s  peak {:8.1f} MiB".format(
+            label + ":", elapsed, peak / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main(*(float(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Benchmark `has_license` through `access_nested_map` and `compile_path`.
+
+The 9 repos of `fixtures.TEST_PAYLOAD` are repeated up to the requested
+number of entries (1M by default) and filtered by license key.
+
+Usage: ./bench_paths.py [entries]
+"""
+import sys
+import time
+from typing import Callable, Dict, List
+
+from fixtures import TEST_PAYLOAD
+from utils import access_nested_map, compile_path
+
+
+def has_license_nested(repo: Dict, license_key: str) -> bool:
+    """`has_license` as written with `access_nested_map`"""
+    try:
+        return access_nested_map(repo, ("license", "key")) == license_key
+    except KeyError:
+        return False
+
+
+_license_key = compile_path(("license", "key"), default=None)
+
+
+def has_license_compiled(repo: Dict, license_key: str) -> bool:
+    """`has_license` as written with `compile_path`"""
+    return _license_key(repo) == license_key
+
+
+def measure(has_license: Callable[[Dict, str], bool],
+            repos: List[Dict]) -> float:
+    """Return the seconds taken to filter ``repos`` by license"""
+    start = time.perf_counter()
+    [repo for repo in repos if has_license(repo, "apache-2.0")]
+    return time.perf_counter() - start
+
+
+def main(n: int = 1000000) -> None:
+    """Run both variants over ``n`` repos"""
+    template = TEST_PAYLOAD[0][1]
+    repos = (template * (n // len(template) + 1))[:n]
+    before = measure(has_license_nested, repos)
+    after = measure(has_license_compiled, repos)
+    print("access_nested_map: {:.3f}s".format(before))
+    print("compile_path:      {:.3f}s".format(after))
+    print("speedup: {:.2f}x".format(before / after))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
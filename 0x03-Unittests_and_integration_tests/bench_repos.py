@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Benchmark the memory held by raw repo dicts and projected records.
+
+Decodes the requested number of `synthetic.generate_repos` repos (100k
+by default), and reports the memory retained by the
+raw `repos_payload` list against `Repo` records of `REPO_FIELDS`.
+
+Usage: ./bench_repos.py [repos]
+"""
+import json
+import sys
+import tracemalloc
+from typing import Callable, List
+
+from client import GithubOrgClient
+from synthetic import generate_repos
+from utils import make_record_type
+
+
+def retained(build: Callable[[], List]) -> int:
+    """Return the bytes still allocated by the result of ``build``"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(n: int = 100000) -> None:
+    """Compare both representations over ``n`` repos"""
+    lines = [json.dumps(repo) for repo in generate_repos(n)]
+    Repo = make_record_type("Repo", GithubOrgClient.REPO_FIELDS)
+    raw = retained(lambda: [json.loads(line) for line in lines])
+    projected = retained(
+        lambda: [Repo.from_mapping(json.loads(line)) for line in lines])
+    print("raw dicts:      {:8.1f} MiB".format(raw / 2 ** 20))
+    print("Repo records:   {:8.1f} MiB".format(projected / 2 ** 20))
+    print("reduction: {:.1f}x".format(raw / projected))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
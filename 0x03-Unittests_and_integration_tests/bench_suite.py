@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""Benchmark suite of the utils and client hot paths, with a regression
+gate against stored baselines.
+
+Each benchmark in `BENCHMARKS` is timed with `timeit` (best of several
+repeats, per call). ``--save`` stores the timings as the baseline file;
+otherwise they are compared with it and the script exits with status 1
+when any benchmark is slower than its baseline by more than
+``--threshold`` (20% by default). A benchmark over the threshold is
+re-run up to ``--confirm`` times and keeps its best timing, so a noisy
+run alone does not fail the gate. Baselines are machine specific and
+not committed: run ``--save`` on the machine that runs the gate first;
+gating a benchmark with no stored baseline is an error.
+
+Usage: ./bench_suite.py [--save] [--baseline FILE] [--threshold RATIO]
+                        [--repeat N] [--confirm N] [NAME ...]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cassette import Cassette
+from client import GithubOrgClient
+from fixtures import load
+from stub_server import StubGitHubServer
+from synthetic import generate_org
+from utils import access_nested_map, get_json, make_session, memoize
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "bench_baseline.json")
+
+# name -> setup; a setup registers its cleanups on the stack and returns
+# the callable to time
+BENCHMARKS: Dict[str, Callable[[ExitStack], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str) -> Callable:
+    """Register a benchmark setup under ``name``"""
+    def register(setup: Callable[[ExitStack], Callable[[], Any]]
+                 ) -> Callable:
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark("access_nested_map.hit")
+def _nested_hit(stack: ExitStack) -> Callable[[], Any]:
+    """A three-level path present in the map"""
+    nested_map = {"a": {"b": {"c": 1}}}
+    return lambda: access_nested_map(nested_map, ("a", "b", "c"))
+
+
+@benchmark("access_nested_map.miss")
+def _nested_miss(stack: ExitStack) -> Callable[[], Any]:
+    """A path running into a non-mapping value"""
+    nested_map = {"a": {"b": 2}}
+
+    def miss() -> None:
+        try:
+            access_nested_map(nested_map, ("a", "b", "c"))
+        except KeyError:
+            pass
+    return miss
+
+
+@benchmark("access_nested_map.deep")
+def _nested_deep(stack: ExitStack) -> Callable[[], Any]:
+    """A 64-level path"""
+    path = tuple("k{}".format(i) for i in range(64))
+    nested_map: Any = 1
+    for key in reversed(path):
+        nested_map = {key: nested_map}
+    return lambda: access_nested_map(nested_map, path)
+
+
+class _Memoized:
+    """Holder of a memoized property"""
+
+    @memoize
+    def value(self) -> int:
+        """Memoize value"""
+        return 42
+
+
+@benchmark("memoize.first_call")
+def _memoize_first(stack: ExitStack) -> Callable[[], Any]:
+    """First access on a fresh instance"""
+    return lambda: _Memoized().value
+
+
+@benchmark("memoize.cached")
+def _memoize_cached(stack: ExitStack) -> Callable[[], Any]:
+    """Repeated access on one instance"""
+    instance = _Memoized()
+    return lambda: instance.value
+
+
+@benchmark("has_license")
+def _has_license(stack: ExitStack) -> Callable[[], Any]:
+    """`has_license` over the fixture repos"""
+    repos = load("google").repos
+    has_license = GithubOrgClient.has_license
+    return lambda: [has_license(repo, "apache-2.0") for repo in repos]
+
+
+def _stub(stack: ExitStack) -> Tuple[StubGitHubServer, Any]:
+    """A started stub serving 300 synthetic repos, and a session to it"""
+    stub = stack.enter_context(StubGitHubServer(
+        {"google": generate_org(300)}, per_page=100))
+    session = make_session()
+    stack.callback(session.close)
+    return stub, session
+
+
+@benchmark("public_repos.all")
+def _public_repos(stack: ExitStack) -> Callable[[], Any]:
+    """Unfiltered `public_repos` of a fresh client"""
+    stub, session = _stub(stack)
+    return lambda: stub.client("google", session=session).public_repos()
+
+
+@benchmark("public_repos.license")
+def _public_repos_license(stack: ExitStack) -> Callable[[], Any]:
+    """`public_repos` of a fresh client, filtered by license"""
+    stub, session = _stub(stack)
+    return lambda: stub.client("google", session=session).public_repos(
+        "apache-2.0")
+
+
+@benchmark("public_repos.cassette")
+def _public_repos_cassette(stack: ExitStack) -> Callable[[], Any]:
+    """Unfiltered `public_repos` replayed offline from a cassette"""
+    path = os.path.join(stack.enter_context(tempfile.TemporaryDirectory()),
+                        "github.cassette")
+    with ExitStack() as recording:
+        stub, _ = _stub(recording)
+        with Cassette(path, mode="record") as cassette:
+            stub.client("google", session=cassette).public_repos()
+    cassette = stack.enter_context(Cassette(path))
+    return lambda: stub.client("google", session=cassette).public_repos()
+
+
+@benchmark("get_json.local")
+def _get_json(stack: ExitStack) -> Callable[[], Any]:
+    """`get_json` of the org from the local stub"""
+    stub, session = _stub(stack)
+    url = stub.url + "/orgs/google"
+    return lambda: get_json(url, session=session)
+
+
+def run(name: str, repeat: int = 5, number: Optional[int] = None) -> float:
+    """Best seconds per call of benchmark ``name`` over ``repeat`` runs.
+    Without ``number``, each run lasts at least 0.2 seconds.
+    """
+    with ExitStack() as stack:
+        timer = timeit.Timer(BENCHMARKS[name](stack))
+        if number is None:
+            number = timer.autorange()[0]
+        return min(timer.repeat(repeat, number)) / number
+
+
+def regressions(results: Dict[str, float], baseline: Dict[str, float],
+                threshold: float = 0.2
+                ) -> List[Tuple[str, float, float]]:
+    """``(name, baseline, result)`` of every benchmark slower than its
+    baseline by more than ``threshold`` (a ratio)
+    """
+    return [
+        (name, baseline[name], seconds)
+        for name, seconds in sorted(results.items())
+        if name in baseline and seconds > baseline[name] * (1 + threshold)
+    ]
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Run the suite, then save or gate on the baseline"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="NAME",
+                        help="benchmarks to run, all by default")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true",
+                        help="store the timings as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown ratio")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--confirm", type=int, default=2,
+                        help="re-runs of a benchmark over the threshold")
+    args = parser.parse_args(argv)
+    baseline: Dict[str, float] = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    names = args.names or list(BENCHMARKS)
+    missing = [name for name in names if name not in baseline]
+    if missing and not args.save:
+        parser.error("no baseline for {} in {}; run with --save on this "
+                     "machine first".format(", ".join(missing),
+                                            args.baseline))
+    results = {}
+    for name in names:
+        results[name] = seconds = run(name, args.repeat)
+        line = "{:<24} {:10.2f} us".format(name, seconds * 1e6)
+        if name in baseline:
+            line += "  {:+6.1%}".format(seconds / baseline[name] - 1)
+        print(line)
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("saved {}".format(args.baseline))
+        return 0
+    slower = regressions(results, baseline, args.threshold)
+    for attempt in range(args.confirm):
+        if not slower:
+            break
+        for name, _, seconds in slower:
+            results[name] = min(seconds, run(name, args.repeat))
+        slower = regressions(results, baseline, args.threshold)
+    for name, before, after in slower:
+        print("REGRESSION {}: {:.2f} us -> {:.2f} us".format(
+            name, before * 1e6, after * 1e6))
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
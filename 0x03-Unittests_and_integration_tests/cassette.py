@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""Record and replay the HTTP exchanges of `utils.get_json`.
+
+A `Cassette` stands in for the ``requests.Session`` given to `get_json`
+(or installed with `utils.set_session`). Recording, it forwards every
+GET to a real session and keeps the status, headers, body and latency of
+each response; replaying, it answers from the cassette file without any
+network, at full speed or with the recorded latencies.
+
+The file is one JSON index line followed by the response bodies, each
+distinct body stored once; bodies are read on demand when replayed.
+
+Usage: ./cassette.py PATH
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils import make_session
+
+MODES = ("record", "replay", "once")
+
+
+class CassetteMiss(LookupError):
+    """A replayed request that was never recorded"""
+
+
+class Interaction(NamedTuple):
+    """One recorded GET and where its response body is stored"""
+    url: str
+    request_headers: Dict[str, str]
+    status: int
+    headers: Dict[str, str]
+    elapsed: float
+    offset: int
+    length: int
+
+    @property
+    def key(self) -> Tuple:
+        """What a replayed request is matched on"""
+        return _key(self.url, self.request_headers)
+
+
+def _key(url: str, headers: Optional[Dict[str, str]]) -> Tuple:
+    """Match key of a GET of ``url`` with request ``headers``"""
+    return (url, tuple(sorted((headers or {}).items())))
+
+
+class Cassette:
+    """A session-like recorder and player of GET responses.
+    Parameters
+    ----------
+    path: str
+        cassette file
+    mode: str
+        ``"record"`` to send requests and (over)write ``path`` on
+        `close`, ``"replay"`` to answer from ``path`` only, ``"once"``
+        to replay ``path`` if it exists and record it otherwise
+    session: requests.Session
+        session recording goes through; a pooled one by default
+    realtime: bool
+        replay each response after its recorded latency instead of
+        immediately
+    Example
+    -------
+    >>> with Cassette("github.cassette", mode="once") as session:
+    ...     repos = GithubOrgClient("google", session=session).public_repos()
+    """
+
+    def __init__(self, path: str, mode: str = "replay",
+                 session: requests.Session = None,
+                 realtime: bool = False) -> None:
+        """Init method of Cassette"""
+        if mode not in MODES:
+            raise ValueError("mode must be one of {}".format(MODES))
+        if mode == "once":
+            mode = "replay" if os.path.exists(path) else "record"
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+        self.interactions: List[Interaction] = []
+        self._lock = threading.Lock()
+        self._session = session
+        self._own_session = False
+        self._bodies = bytearray()
+        self._offsets: Dict[bytes, int] = {}
+        self._index: Dict[Tuple, List[Interaction]] = {}
+        self._played: Dict[Tuple, int] = {}
+        self._file = None
+        if mode == "record" and session is None:
+            self._session = make_session()
+            self._own_session = True
+        elif mode == "replay":
+            self._load()
+
+    def _load(self) -> None:
+        """Read the index of the cassette file"""
+        self._file = open(self.path, "rb")
+        index = json.loads(self._file.readline())
+        self._start = self._file.tell()
+        self.interactions = [Interaction(*entry) for entry in index]
+        for interaction in self.interactions:
+            self._index.setdefault(interaction.key, []).append(interaction)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """GET ``url``, recording or replaying the response"""
+        if self.mode == "record":
+            return self._record(url, **kwargs)
+        return self._replay(url, kwargs.get("headers"))
+
+    def _record(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send the GET and keep its response"""
+        start = time.perf_counter()
+        response = self._session.get(url, **kwargs)
+        body = response.content
+        elapsed = time.perf_counter() - start
+        digest = hashlib.sha1(body).digest()
+        with self._lock:
+            offset = self._offsets.get(digest)
+            if offset is None:
+                offset = self._offsets[digest] = len(self._bodies)
+                self._bodies += body
+            self.interactions.append(Interaction(
+                url, dict(kwargs.get("headers") or {}),
+                response.status_code, dict(response.headers), elapsed,
+                offset, len(body)))
+        return response
+
+    def _replay(self, url: str,
+                headers: Optional[Dict[str, str]]) -> requests.Response:
+        """Answer with the next recorded response to the same request.
+        A request made more often than it was recorded gets the last
+        recorded response again.
+        """
+        key = _key(url, headers)
+        with self._lock:
+            recorded = self._index.get(key)
+            if not recorded:
+                raise CassetteMiss("{} not recorded in {}".format(
+                    url, self.path))
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+            interaction = recorded[min(played, len(recorded) - 1)]
+            self._file.seek(self._start + interaction.offset)
+            body = self._file.read(interaction.length)
+        if self.realtime:
+            time.sleep(interaction.elapsed)
+        response = requests.Response()
+        response.status_code = interaction.status
+        response.url = url
+        response.headers = CaseInsensitiveDict(interaction.headers)
+        response.elapsed = timedelta(seconds=interaction.elapsed)
+        response._content = body
+        response._content_consumed = True
+        return response
+
+    def save(self) -> None:
+        """Write the recorded interactions to the cassette file"""
+        with self._lock:
+            index = json.dumps([list(i) for i in self.interactions])
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(index.encode() + b"\n")
+                f.write(self._bodies)
+            os.replace(tmp, self.path)
+
+    def close(self) -> None:
+        """Save a recording, and release the file and session"""
+        if self.mode == "record":
+            self.save()
+            if self._own_session:
+                self._session.close()
+        elif self._file is not None:
+            self._file.close()
+
+    def __enter__(self) -> "Cassette":
+        """Use the cassette as a session"""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the cassette"""
+        self.close()
+
+
+def main(argv: Optional[list] = None) -> None:
+    """List the interactions of a cassette"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="cassette file")
+    args = parser.parse_args(argv)
+    with Cassette(args.path) as cassette:
+        for interaction in cassette.interactions:
+            print("{}\t{:.1f}ms\t{}\t{}".format(
+                interaction.status, interaction.elapsed * 1000,
+                interaction.length, interaction.url))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,58 +1,329 @@
 #!/usr/bin/env python3
 """A github org client
 """
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from typing import (
+    Any,
+    Callable,
+    ClassVar,
     List,
     Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
 )
 
+import requests
+
 from utils import (
+    LRUCache,
+    async_get_json,
+    async_get_json_page,
     get_json,
-    access_nested_map,
+    iter_json_pages,
+    last_page_number,
+    with_page,
+    async_memoize,
+    compile_path,
+    make_record_type,
     memoize,
 )
 
 
+_license_key = compile_path(("license", "key"), default=None)
+_ABSENT = object()
+
+
 class GithubOrgClient:
     """A Githib org client
     """
     ORG_URL = "https://api.github.com/orgs/{org}"
+    REPO_FIELDS = ("name", "license.key")
+    shared_cache: ClassVar[Optional[LRUCache]] = None
 
-    def __init__(self, org_name: str) -> None:
-        """Init method of GithubOrgClient"""
+    def __init__(self, org_name: str,
+                 session: requests.Session = None,
+                 repo_fields: Iterable[str] = None) -> None:
+        """Init method of GithubOrgClient
+        With ``repo_fields`` (e.g. ``REPO_FIELDS``), ``repos_payload``
+        keeps compact slotted ``Repo`` records of those fields only.
+        """
         self._org_name = org_name
+        self._session = session
+        self._license_index: Optional[tuple] = None
+        self._repo_fields = None
+        self._repo_type = None
+        if repo_fields is not None:
+            self._repo_fields = tuple(sorted(set(repo_fields)))
+            self._repo_type = make_record_type("Repo", self._repo_fields)
+
+    @classmethod
+    def enable_shared_cache(cls, maxsize: int = 1024,
+                            ttl: Optional[float] = 300) -> LRUCache:
+        """Share org and repos payloads across every client instance,
+        keeping at most ``maxsize`` payloads for ``ttl`` seconds each.
+        """
+        cls.shared_cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        return cls.shared_cache
+
+    @classmethod
+    def disable_shared_cache(cls) -> None:
+        """Go back to per-instance memoization only"""
+        cls.shared_cache = None
+
+    def _shared(self, key: tuple, fetch: Callable[[], Any]) -> Any:
+        """Look ``key`` up in the shared cache, filling it with ``fetch``"""
+        cache = self.shared_cache
+        if cache is None:
+            return fetch()
+        value = cache.get(key)
+        if value is None:
+            value = fetch()
+            cache.set(key, value)
+        return value
 
     @memoize
     def org(self) -> Dict:
         """Memoize org"""
-        return get_json(self.ORG_URL.format(org=self._org_name))
+        url = self.ORG_URL.format(org=self._org_name)
+        return self._shared(
+            ("org", self._org_name, url),
+            lambda: get_json(url, session=self._session),
+        )
 
     @property
     def _public_repos_url(self) -> str:
         """Public repos URL"""
         return self.org["repos_url"]
 
+    def _repos_key(self, url: str) -> tuple:
+        """Shared cache key of the repos payload listed at ``url``"""
+        return ("repos", url, self._repo_fields)
+
     @memoize
-    def repos_payload(self) -> Dict:
-        """Memoize repos payload"""
-        return get_json(self._public_repos_url)
+    def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload, concatenated across all pages"""
+        url = self._public_repos_url
+
+        return self._shared(self._repos_key(url), lambda: [
+            repo for page in iter_json_pages(
+                url, session=self._session, fields=self._repo_type)
+            for repo in page
+        ])
+
+    def iter_public_repos(self, license: str = None) -> Iterator[str]:
+        """Yield public repo names page by page as they arrive, or from
+        the repos payload when it is already memoized
+        """
+        cached = type(self).repos_payload.cached(self)
+        if cached is None:
+            url = self._public_repos_url
+            if self.shared_cache is not None:
+                cached = self.shared_cache.get(self._repos_key(url))
+        pages = [cached] if cached is not None else iter_json_pages(
+            url, session=self._session, stream=True)
+        for page in pages:
+            for repo in page:
+                if license is None or self.has_license(repo, license):
+                    yield repo["name"]
+
+    @property
+    def license_index(self) -> Dict[Optional[str], List[str]]:
+        """Repo names by license key (None for unlicensed repos), built
+        once per repos payload and rebuilt when the payload is refreshed
+        """
+        payload = self.repos_payload
+        cached = self._license_index
+        if cached is None or cached[0] is not payload:
+            index: Dict[Optional[str], List[str]] = {}
+            for repo in payload:
+                index.setdefault(_license_key(repo), []).append(repo["name"])
+            self._license_index = (payload, index)
+        return self._license_index[1]
 
     def public_repos(self, license: str = None) -> List[str]:
-        """Public repos"""
-        json_payload = self.repos_payload
-        public_repos = [
-            repo["name"] for repo in json_payload
-            if license is None or self.has_license(repo, license)
-        ]
+        """Public repos. Unfiltered, they are read from the repos payload
+        when it is already memoized or shared, and otherwise streamed
+        page by page keeping only the names; filtered by ``license``,
+        they come from the license index.
+        """
+        if license is None:
+            return list(self.iter_public_repos())
+        return list(self.license_index.get(license, ()))
 
-        return public_repos
+    def public_repos_by_license(
+        self,
+        licenses: Iterable[Optional[str]] = None,
+        where: Mapping[str, Callable[[Any], bool]] = None,
+    ) -> Dict[Optional[str], List[str]]:
+        """Partition public repo names by license key in a single pass.
+        ``licenses`` selects the keys to return (None for unlicensed
+        repos; every key when omitted). ``where`` maps dotted field paths
+        to predicates that a repo must all satisfy, e.g.
+        ``{"forks": lambda forks: forks > 10, "private": operator.not_}``;
+        a repo missing one of the fields does not satisfy it. Raises
+        ValueError for a field dropped by ``repo_fields``.
+        """
+        if where:
+            for path in where:
+                self._check_projected(path)
+            predicates = [
+                (compile_path(path.split("."), default=_ABSENT), predicate)
+                for path, predicate in where.items()
+            ]
+            groups: Dict[Optional[str], List[str]] = {}
+            for repo in self.repos_payload:
+                if all(_matches(get(repo), predicate)
+                       for get, predicate in predicates):
+                    groups.setdefault(_license_key(repo), []).append(
+                        repo["name"])
+        else:
+            groups = self.license_index
+        if licenses is None:
+            return {key: list(names) for key, names in groups.items()}
+        return {key: list(groups.get(key, ())) for key in licenses}
+
+    def _check_projected(self, path: str) -> None:
+        """Raise ValueError unless the repos payload keeps ``path``"""
+        if self._repo_fields is None or any(
+            path == field or path.startswith(field + ".")
+            for field in self._repo_fields
+        ):
+            return
+        raise ValueError("{!r} is not among the projected repo fields {}"
+                         .format(path, self._repo_fields))
+
+    def group_by_license(
+        self,
+        where: Mapping[str, Callable[[Any], bool]] = None,
+    ) -> Dict[Optional[str], List[str]]:
+        """Public repo names grouped by every license key present"""
+        return self.public_repos_by_license(where=where)
 
     @staticmethod
     def has_license(repo: Dict[str, Dict], license_key: str) -> bool:
         """Static: has_license"""
         assert license_key is not None, "license_key cannot be None"
+        return _license_key(repo) == license_key
+
+
+def _matches(value: Any, predicate: Callable[[Any], bool]) -> bool:
+    """Whether a field ``value`` is present and satisfies ``predicate``"""
+    return value is not _ABSENT and predicate(value)
+
+
+class AsyncGithubOrgClient:
+    """An asyncio Github org client
+    Pages after the first are fetched concurrently, at most
+    ``concurrency`` at a time, and concatenated in page order.
+    """
+    ORG_URL = GithubOrgClient.ORG_URL
+
+    def __init__(self, org_name: str, concurrency: int = 8,
+                 session: requests.Session = None) -> None:
+        """Init method of AsyncGithubOrgClient"""
+        self._org_name = org_name
+        self._concurrency = concurrency
+        self._session = session
+
+    @async_memoize
+    async def org(self) -> Dict:
+        """Memoize org"""
+        return await async_get_json(
+            self.ORG_URL.format(org=self._org_name), session=self._session)
+
+    async def _public_repos_url(self) -> str:
+        """Public repos URL"""
+        return (await self.org())["repos_url"]
+
+    @async_memoize
+    async def repos_payload(self) -> List[Dict]:
+        """Memoize repos payload, concatenated across all pages"""
+        url = await self._public_repos_url()
+        first, links = await async_get_json_page(url, session=self._session)
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def fetch(page: int) -> List[Dict]:
+            """Fetch one page under the concurrency limit"""
+            async with semaphore:
+                return await async_get_json(
+                    with_page(url, page), session=self._session)
+
+        rest = await asyncio.gather(*(
+            fetch(page) for page in range(2, last_page_number(links) + 1)
+        ))
+        return [repo for page in (first, *rest) for repo in page]
+
+    async def public_repos(self, license: str = None) -> List[str]:
+        """Public repos"""
+        return [
+            repo["name"] for repo in await self.repos_payload()
+            if license is None or self.has_license(repo, license)
+        ]
+
+    has_license = staticmethod(GithubOrgClient.has_license)
+
+
+class OrgResult(NamedTuple):
+    """Outcome of one org in `fetch_many_orgs`"""
+    org: str
+    repos: Optional[List[str]]
+    elapsed: float
+    error: Optional[Exception] = None
+
+
+def fetch_many_orgs(
+    org_names: Iterable[str],
+    license: str = None,
+    concurrency: int = 8,
+    session: requests.Session = None,
+) -> Iterator[OrgResult]:
+    """Fetch the public repos of many orgs over a bounded thread pool.
+    Duplicate org names are fetched once, and orgs sharing a repos URL
+    share one repos fetch. Results are yielded as they complete, with
+    the seconds each org took; a failed org yields its exception.
+    """
+    payloads: Dict[str, Future] = {}
+    lock = threading.Lock()
+
+    def repos_payload(client: GithubOrgClient) -> List[Dict]:
+        """Fetch a repos URL once, whichever org asks first"""
+        url = client._public_repos_url
+        with lock:
+            future = payloads.get(url)
+            leader = future is None
+            if leader:
+                future = payloads[url] = Future()
+        if leader:
+            try:
+                future.set_result(client.repos_payload)
+            except Exception as exc:
+                future.set_exception(exc)
+        return future.result()
+
+    def fetch(org_name: str) -> OrgResult:
+        """Fetch and filter the repos of one org"""
+        start = time.perf_counter()
         try:
-            has_license = access_nested_map(repo, ("license", "key")) == license_key
-        except KeyError:
-            return False
-        return has_license
+            client = GithubOrgClient(org_name, session=session)
+            repos = [
+                repo["name"] for repo in repos_payload(client)
+                if license is None or client.has_license(repo, license)
+            ]
+        except Exception as exc:
+            return OrgResult(org_name, None,
+                             time.perf_counter() - start, exc)
+        return OrgResult(org_name, repos, time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(fetch, org_name)
+            for org_name in dict.fromkeys(org_names)
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Load-test `GithubOrgClient` against the local GitHub API stub.
+
+Runs ``callers`` threads, each making ``calls`` fresh-client calls of
+``org``, ``repos_payload`` or ``public_repos`` through one shared pooled
+session, and reports calls/sec, p50/p99 latency and the peak memory
+traced over a second, identical run.
+
+With ``--repos N`` the stub serves a `synthetic.generate_org` org of N
+repos instead of the fixture org.
+
+Usage: ./load_test.py [--callers N] [--calls N] [--latency S]
+                      [--per-page N] [--repos N] [--target NAME ...]
+"""
+import argparse
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from client import GithubOrgClient
+from stub_server import StubGitHubServer
+from synthetic import generate_org
+from utils import make_session
+
+TARGETS: Dict[str, Callable[[GithubOrgClient], object]] = {
+    "org": lambda client: client.org,
+    "repos_payload": lambda client: client.repos_payload,
+    "public_repos": lambda client: client.public_repos(),
+}
+
+
+class LoadResult(NamedTuple):
+    """Outcome of one load run"""
+    target: str
+    calls: int
+    requests: int
+    seconds: float
+    p50: float
+    p99: float
+    peak_bytes: Optional[int]
+
+    @property
+    def rate(self) -> float:
+        """Calls per second"""
+        return self.calls / self.seconds
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank ``q`` quantile (0 to 1) of sorted ``samples``"""
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _run(stub: StubGitHubServer, call: Callable[[GithubOrgClient], object],
+         callers: int, calls: int) -> List[float]:
+    """Latencies of ``callers`` x ``calls`` concurrent calls"""
+    session = make_session(pool_maxsize=callers)
+    latencies: List[List[float]] = [[] for _ in range(callers)]
+    start = threading.Barrier(callers)
+
+    def worker(samples: List[float]) -> None:
+        """Make ``calls`` calls, each on a fresh client"""
+        start.wait()
+        for _ in range(calls):
+            began = time.perf_counter()
+            call(stub.client("google", session=session))
+            samples.append(time.perf_counter() - began)
+
+    threads = [threading.Thread(target=worker, args=(samples,))
+               for samples in latencies]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        session.close()
+    return [sample for samples in latencies for sample in samples]
+
+
+def run_load(stub: StubGitHubServer, target: str, callers: int = 8,
+             calls: int = 50, trace_memory: bool = True) -> LoadResult:
+    """Load ``stub`` with calls of ``target`` (a key of `TARGETS`)"""
+    call = TARGETS[target]
+    served = stub.requests
+    began = time.perf_counter()
+    latencies = sorted(_run(stub, call, callers, calls))
+    seconds = time.perf_counter() - began
+    served = stub.requests - served
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            _run(stub, call, callers, calls)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return LoadResult(target, len(latencies), served, seconds,
+                      percentile(latencies, 0.5), percentile(latencies, 0.99),
+                      peak)
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Run the load test and print one line per target"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--callers", type=int, default=8,
+                        help="concurrent caller threads")
+    parser.add_argument("--calls", type=int, default=50,
+                        help="calls made by each caller")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="seconds the stub waits before answering")
+    parser.add_argument("--per-page", type=int, default=None,
+                        help="repos per page served by the stub")
+    parser.add_argument("--repos", type=int, default=None,
+                        help="serve a synthetic org of this many repos")
+    parser.add_argument("--target", choices=sorted(TARGETS), nargs="+",
+                        default=list(TARGETS))
+    args = parser.parse_args(argv)
+    print("{:<14} {:>6} {:>8} {:>9} {:>9} {:>9} {:>10}".format(
+        "target", "calls", "requests", "calls/s", "p50 ms", "p99 ms",
+        "peak KiB"))
+    orgs = None
+    if args.repos is not None:
+        orgs = {"google": generate_org(args.repos)}
+    with StubGitHubServer(orgs, latency=args.latency,
+                          per_page=args.per_page) as stub:
+        for target in args.target:
+            result = run_load(stub, target, args.callers, args.calls)
+            print("{:<14} {:>6} {:>8} {:>9.1f} {:>9.2f} {:>9.2f} {:>10.1f}"
+                  .format(target, result.calls, result.requests,
+                          result.rate, result.p50 * 1000,
+                          result.p99 * 1000, result.peak_bytes / 1024))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Rate-limit-aware request scheduling for `utils.get_json`.
+
+`RateLimitScheduler` spreads requests with a token bucket, slows down to
+the quota GitHub reports in ``X-RateLimit-Remaining``/``X-RateLimit-Reset``
+and retries throttled or failed requests with jittered exponential
+backoff, honouring ``Retry-After``. Install it with
+`utils.set_scheduler(RateLimitScheduler())`.
+"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+import requests
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds to wait given by a ``Retry-After`` header, if any.
+    The header holds either a number of seconds or an HTTP date.
+    """
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitScheduler:
+    """Schedule requests under a client-side and a server-side limit.
+    Parameters
+    ----------
+    rate: float
+        requests per second allowed by the token bucket
+    burst: int
+        tokens the bucket holds, i.e. requests sent back to back
+    max_retries: int
+        retries of a throttled (403 with no quota left or Retry-After,
+        429) or failed (5xx) request before its response is returned
+    backoff: float
+        base delay of the exponential backoff, in seconds
+    max_backoff: float
+        cap on a single backoff delay, in seconds
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 10,
+                 max_retries: int = 5, backoff: float = 0.5,
+                 max_backoff: float = 60.0) -> None:
+        """Init method of RateLimitScheduler"""
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+        self.retries = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _current_rate(self, now: float) -> float:
+        """Bucket refill rate, lowered to spread the remaining quota
+        evenly until it resets
+        """
+        if self.remaining and self.reset is not None and self.reset > now:
+            return min(self.rate, self.remaining / (self.reset - now))
+        return self.rate
+
+    def acquire(self) -> float:
+        """Wait for a slot to send one request; return the seconds waited.
+        Each caller reserves a token up front, so concurrent callers are
+        spaced out instead of woken together. Once the server reports no
+        quota left, every caller waits for the reset until it has passed.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wall = time.time()
+            rate = self._current_rate(wall)
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / rate)
+            if self.remaining == 0 and self.reset is not None:
+                if self.reset > wall:
+                    wait = max(wait, self.reset - wall)
+                else:
+                    self.remaining = None
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def update(self, response: requests.Response) -> None:
+        """Record the quota reported by ``response``"""
+        headers = response.headers
+        with self._lock:
+            if "X-RateLimit-Remaining" in headers:
+                self.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                self.reset = float(headers["X-RateLimit-Reset"])
+
+    def should_retry(self, response: requests.Response) -> bool:
+        """Whether ``response`` reports throttling or a server error"""
+        if response.status_code in RETRY_STATUSES:
+            return True
+        return response.status_code == 403 and (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0")
+
+    def delay(self, attempt: int, response: requests.Response) -> float:
+        """Seconds to wait before retry number ``attempt`` (from 0).
+        ``Retry-After`` wins; otherwise the wait is drawn uniformly up to
+        an exponentially growing cap ("full jitter").
+        """
+        after = retry_after(response)
+        if after is not None:
+            return after
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            if self.reset is not None:
+                return max(0.0, self.reset - time.time())
+        return random.uniform(
+            0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def send(self, request: Callable[[], requests.Response]
+             ) -> requests.Response:
+        """Send ``request`` when allowed, retrying while it is throttled"""
+        attempt = 0
+        while True:
+            self.acquire()
+            response = request()
+            self.update(response)
+            if attempt >= self.max_retries or not self.should_retry(response):
+                return response
+            response.close()
+            time.sleep(self.delay(attempt, response))
+            attempt += 1
+            with self._lock:
+                self.retries += 1
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Persistent response cache backed by a sqlite file.
+
+`SQLiteCache` stores `CachedResponse` entries keyed by URL so a restarted
+process serves entries younger than the cache ``ttl`` without any request
+and revalidates older ones instead of re-downloading. Install it with
+`utils.set_response_cache(SQLiteCache("github.sqlite"))`.
+
+Usage: ./sqlite_cache.py PATH {stats,list,purge} [--ttl SECONDS] [--expired]
+"""
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from typing import Iterator, Optional, Tuple
+
+from utils import CachedResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    headers TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class SQLiteCache:
+    """A response cache persisted in a sqlite database.
+    Entries younger than ``ttl`` seconds are returned ``fresh``, so
+    `utils.get_json` serves them without a request; older ones are still
+    returned for revalidation until `purge_expired` drops them. Once more
+    than ``max_entries`` entries or ``max_bytes`` of bodies are stored
+    the least recently used ones are evicted. Every write is a single
+    transaction, so readers never see a partially written entry.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None) -> None:
+        """Init method of SQLiteCache"""
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(SCHEMA)
+
+    def _oldest_valid(self) -> float:
+        """Earliest ``stored_at`` of an unexpired entry"""
+        if self.ttl is None:
+            return float("-inf")
+        return time.time() - self.ttl
+
+    def get(self, url: str,
+            default: Optional[CachedResponse] = None
+            ) -> Optional[CachedResponse]:
+        """Return the entry stored for ``url``"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, headers, stored_at >= ? FROM responses"
+                " WHERE url = ?",
+                (self._oldest_valid(), url),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE responses SET accessed_at = ? WHERE url = ?",
+                    (time.time(), url),
+                )
+        return CachedResponse(row[0], json.loads(row[1]),
+                              self.ttl is not None and bool(row[2]))
+
+    def set(self, url: str, response: CachedResponse) -> None:
+        """Store ``response`` for ``url``, then enforce the size caps"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (url, response.body, json.dumps(response.headers), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond the size caps"""
+        if self.max_entries is not None:
+            self._conn.execute(
+                "DELETE FROM responses WHERE url IN (SELECT url FROM"
+                " responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        if self.max_bytes is not None:
+            total = 0
+            rows = self._conn.execute(
+                "SELECT url, length(body) FROM responses"
+                " ORDER BY accessed_at DESC"
+            ).fetchall()
+            for url, size in rows:
+                total += size
+                if total > self.max_bytes:
+                    self._conn.execute(
+                        "DELETE FROM responses WHERE url = ?", (url,))
+
+    def delete(self, url: str) -> None:
+        """Drop ``url`` if present"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def purge_expired(self) -> int:
+        """Drop entries older than ``ttl`` and return how many"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM responses WHERE stored_at < ?",
+                (self._oldest_valid(),),
+            ).rowcount
+
+    def entries(self) -> Iterator[Tuple[str, int, float]]:
+        """Yield ``(url, body size, stored_at)`` of every entry"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, length(body), stored_at FROM responses"
+                " ORDER BY url"
+            ).fetchall()
+        return iter(rows)
+
+    def close(self) -> None:
+        """Close the database connection"""
+        self._conn.close()
+
+    def __len__(self) -> int:
+        """Number of entries"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT count(*) FROM responses").fetchone()[0]
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Inspect or purge a cache file"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="sqlite cache file")
+    parser.add_argument("command", choices=("stats", "list", "purge"))
+    parser.add_argument("--ttl", type=float, default=None,
+                        help="entry lifetime in seconds")
+    parser.add_argument("--expired", action="store_true",
+                        help="purge only entries older than --ttl")
+    args = parser.parse_args(argv)
+    if args.expired and args.ttl is None:
+        parser.error("--expired requires --ttl")
+    cache = SQLiteCache(args.path, ttl=args.ttl)
+    try:
+        if args.command == "stats":
+            size = sum(entry[1] for entry in cache.entries())
+            print("entries: {}\nbytes: {}".format(len(cache), size))
+        elif args.command == "list":
+            for url, size, stored_at in cache.entries():
+                print("{}\t{}\t{}".format(
+                    time.strftime("%Y-%m-%dT%H:%M:%S",
+                                  time.localtime(stored_at)),
+                    size, url))
+        elif args.expired:
+            print("purged {} expired entries".format(cache.purge_expired()))
+        else:
+            count = len(cache)
+            cache.clear()
+            print("purged {} entries".format(count))
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""In-process stub of the GitHub orgs API serving fixture payloads.
+
+`StubGitHubServer` serves ``/orgs/<org>`` and ``/orgs/<org>/repos`` from
+the recorded `fixtures` orgs (or any org payloads) over real HTTP/1.1, with
+configurable latency, ``page``/``per_page`` pagination and ``Link``
+headers, ETag revalidation and GitHub's rate-limit headers.
+
+Usage: ./stub_server.py [port]
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from client import GithubOrgClient
+from fixtures import load, org_names
+from utils import with_page
+
+GITHUB_API = "https://api.github.com"
+
+
+def fixture_orgs() -> Dict[str, Tuple[Dict, List[Dict]]]:
+    """Org and repos payloads of the recorded `fixtures` orgs, by name"""
+    return {
+        org_name: (load(org_name).org, load(org_name).repos)
+        for org_name in org_names()
+    }
+
+
+class StubGitHubServer:
+    """A threaded HTTP server answering like the GitHub orgs API.
+    Parameters
+    ----------
+    orgs: Dict
+        org name to ``(org payload, repos payload)``; the recorded
+        fixture orgs by default. ``https://api.github.com`` in payloads
+        is rewritten to the stub's own URL.
+    latency: float
+        seconds slept before answering each request
+    per_page: int
+        repos per page when the request gives no ``per_page``; None
+        serves every repo on one page
+    etag: bool
+        send ETags and answer ``If-None-Match`` with 304
+    rate_limit: int
+        requests allowed per ``rate_limit_window`` seconds before
+        answering 403; None for no limit
+    port: int
+        port to listen on; 0 picks a free one
+    """
+
+    def __init__(self, orgs: Dict[str, Tuple[Dict, List[Dict]]] = None,
+                 latency: float = 0, per_page: Optional[int] = None,
+                 etag: bool = True, rate_limit: Optional[int] = None,
+                 rate_limit_window: float = 3600, port: int = 0) -> None:
+        """Init method of StubGitHubServer"""
+        self.orgs = fixture_orgs() if orgs is None else orgs
+        self.latency = latency
+        self.per_page = per_page
+        self.etag = etag
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._window_start = time.time()
+        self._used = 0
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the stub, standing in for the GitHub API"""
+        return "http://127.0.0.1:{}".format(self._server.server_port)
+
+    def client(self, org_name: str, **kwargs: Any) -> GithubOrgClient:
+        """Build a `GithubOrgClient` pointed at this stub"""
+        client = GithubOrgClient(org_name, **kwargs)
+        client.ORG_URL = self.url + "/orgs/{org}"
+        return client
+
+    def start(self) -> "StubGitHubServer":
+        """Serve requests from a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubGitHubServer":
+        """Start the stub"""
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop the stub"""
+        self.stop()
+
+    def _quota(self) -> Tuple[Dict[str, str], bool]:
+        """Rate-limit headers for one more request, and whether it is
+        within the limit
+        """
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit is None:
+                return {}, True
+            now = time.time()
+            if now >= self._window_start + self.rate_limit_window:
+                self._window_start, self._used = now, 0
+            allowed = self._used < self.rate_limit
+            self._used += allowed
+            return {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit - self._used),
+                "X-RateLimit-Reset": str(
+                    int(self._window_start + self.rate_limit_window)),
+            }, allowed
+
+    def route(self, path: str) -> Tuple[int, Any, Dict[str, str]]:
+        """Status, payload and extra headers answering GET ``path``"""
+        parts = urlsplit(path)
+        segments = parts.path.strip("/").split("/")
+        if len(segments) < 2 or segments[0] != "orgs" or \
+                segments[1] not in self.orgs or len(segments) > 3 or \
+                (len(segments) == 3 and segments[2] != "repos"):
+            return 404, {"message": "Not Found"}, {}
+        org_payload, repos = self.orgs[segments[1]]
+        if len(segments) == 2:
+            return 200, org_payload, {}
+        query = dict(parse_qsl(parts.query))
+        per_page = int(query.get("per_page", self.per_page or len(repos)))
+        page = int(query.get("page", 1))
+        last = max(1, -(-len(repos) // max(per_page, 1)))
+        url = self.url + path
+        links = []
+        if page < last:
+            links.append('<{}>; rel="next"'.format(with_page(url, page + 1)))
+            links.append('<{}>; rel="last"'.format(with_page(url, last)))
+        headers = {"Link": ", ".join(links)} if links else {}
+        start = (page - 1) * per_page
+        return 200, repos[start:start + per_page], headers
+
+    def _handler_class(self) -> type:
+        """Request handler bound to this stub"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answer GETs through `StubGitHubServer.route`"""
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self) -> None:
+                """Serve one API request"""
+                if stub.latency:
+                    time.sleep(stub.latency)
+                headers, allowed = stub._quota()
+                if allowed:
+                    status, payload, extra = stub.route(self.path)
+                    headers.update(extra)
+                else:
+                    status, payload = 403, {
+                        "message": "API rate limit exceeded"}
+                body = json.dumps(payload).replace(
+                    GITHUB_API, stub.url).encode()
+                headers["Content-Type"] = "application/json"
+                if stub.etag and status == 200:
+                    headers["ETag"] = '"{}"'.format(
+                        hashlib.sha1(body).hexdigest())
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        status, body = 304, b""
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                """Silence per-request logging"""
+
+        return Handler
+
+
+if __name__ == "__main__":
+    stub = StubGitHubServer(port=int(sys.argv[1]) if sys.argv[1:] else 0)
+    print("serving {}/orgs/google".format(stub.url))
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub._server.server_close()
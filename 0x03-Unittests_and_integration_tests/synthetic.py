@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Deterministic synthetic org payloads built from the fixture repos.
+
+`generate_repos` expands the recorded ``google`` fixture repos into
+any number of repos shaped like GitHub's, renamed and re-owned, with
+licenses drawn from a configurable distribution (including a null or
+missing ``license``), all from a seed. Repos are yielded one at a time,
+so `write_repos` streams arbitrarily large listings to disk in constant
+memory.
+
+Usage: ./synthetic.py REPOS [--seed N] [--org NAME] [--output FILE]
+"""
+import argparse
+import bisect
+import json
+import random
+import sys
+from itertools import accumulate
+from typing import IO, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from fixtures import load
+
+# license weight key of repos without a ``license`` field at all
+MISSING = "<missing>"
+
+LICENSE_WEIGHTS: Dict[Optional[str], float] = {
+    "apache-2.0": 40,
+    "mit": 20,
+    "bsd-3-clause": 10,
+    "bsl-1.0": 5,
+    "other": 10,
+    None: 10,
+    MISSING: 5,
+}
+
+
+def _templates() -> List[Dict]:
+    """The fixture repos every synthetic repo is modelled on"""
+    return load("google").repos
+
+
+def license_payload(key: str) -> Dict:
+    """The ``license`` object GitHub sends for ``key``; the fixture one
+    when there is, otherwise one made up in the same shape
+    """
+    for repo in _templates():
+        if repo.get("license") and repo["license"]["key"] == key:
+            return dict(repo["license"])
+    return {
+        "key": key,
+        "name": key.upper(),
+        "spdx_id": key.upper(),
+        "url": "https://api.github.com/licenses/" + key,
+        "node_id": "MDc6TGljZW5zZT{}".format(len(key)),
+    }
+
+
+def _owner(org: str) -> Dict:
+    """The template ``owner`` object re-owned by ``org``"""
+    owner = _templates()[0]["owner"]
+    old = owner["login"]
+    return {
+        key: value.replace(old, org) if isinstance(value, str) else value
+        for key, value in owner.items()
+    }
+
+
+def generate_repos(n: int, seed: int = 0, org: str = "google",
+                   licenses: Mapping[Optional[str], float] = None
+                   ) -> Iterator[Dict]:
+    """Yield ``n`` synthetic repos of ``org``.
+    Parameters
+    ----------
+    n: int
+        number of repos
+    seed: int
+        seed of the generator; the same arguments always yield the same
+        repos
+    org: str
+        login of the owning org, substituted in names and URLs
+    licenses: Mapping
+        relative weight of each license key, `LICENSE_WEIGHTS` by
+        default. A ``None`` key stands for ``"license": null`` and
+        `MISSING` for no ``license`` field.
+    Example
+    -------
+    >>> repos = list(generate_repos(3, seed=1))
+    >>> [repo["full_name"] for repo in repos]
+    ['google/episodes.dart-0', 'google/cpp-netlib-1', 'google/dagger-2']
+    """
+    rng = random.Random(seed)
+    templates = _templates()
+    weights = LICENSE_WEIGHTS if licenses is None else licenses
+    keys = list(weights)
+    cumulative = list(accumulate(weights.values()))
+    payloads = {
+        key: license_payload(key) for key in keys
+        if key is not None and key != MISSING
+    }
+    owner = _owner(org)
+    # names of the string fields that embed each template's full name
+    urls = [
+        [key for key, value in template.items()
+         if isinstance(value, str) and template["full_name"] in value]
+        for template in templates
+    ]
+    for i in range(n):
+        template = templates[i % len(templates)]
+        repo = dict(template)
+        name = "{}-{}".format(template["name"], i)
+        full_name = "{}/{}".format(org, name)
+        for key in urls[i % len(templates)]:
+            repo[key] = template[key].replace(template["full_name"],
+                                              full_name)
+        repo["id"] = 10000000 + i
+        repo["name"] = name
+        repo["owner"] = dict(owner)
+        repo["permissions"] = dict(template["permissions"])
+        stars = int(rng.paretovariate(1.2)) - 1
+        repo["stargazers_count"] = repo["watchers_count"] = stars
+        repo["watchers"] = stars
+        repo["forks_count"] = repo["forks"] = rng.randrange(stars // 4 + 1)
+        repo["size"] = rng.randrange(1, 100000)
+        key = keys[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+        if key == MISSING:
+            del repo["license"]
+        else:
+            repo["license"] = None if key is None else dict(payloads[key])
+        yield repo
+
+
+def generate_org(n: int, seed: int = 0, org: str = "google",
+                 licenses: Mapping[Optional[str], float] = None
+                 ) -> Tuple[Dict, List[Dict]]:
+    """``(org payload, repos payload)`` of a synthetic org of ``n``
+    repos, shaped like the `fixtures.TEST_PAYLOAD` entries
+    """
+    payload = {"repos_url": "https://api.github.com/orgs/{}/repos".format(
+        org)}
+    return payload, list(generate_repos(n, seed, org, licenses))
+
+
+def write_repos(out: IO[str], n: int, seed: int = 0, org: str = "google",
+                licenses: Mapping[Optional[str], float] = None) -> int:
+    """Stream a JSON array of ``n`` synthetic repos to ``out`` and return
+    the number of characters written
+    """
+    written = out.write("[")
+    for i, repo in enumerate(generate_repos(n, seed, org, licenses)):
+        written += out.write(("," if i else "") + json.dumps(repo))
+    return written + out.write("]")
+
+
+def main(argv: Optional[list] = None) -> None:
+    """Write a synthetic repos listing"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("repos", type=int, help="number of repos")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--org", default="google")
+    parser.add_argument("--output", help="file to write, stdout if unset")
+    args = parser.parse_args(argv)
+    if args.output is None:
+        write_repos(sys.stdout, args.repos, args.seed, args.org)
+        return
+    with open(args.output, "w") as out:
+        size = write_repos(out, args.repos, args.seed, args.org)
+    print("wrote {} repos, {:.1f} MiB".format(args.repos, size / 2 ** 20))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Module for unit tests of the benchmark suite's regression gate.
+"""
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from parameterized import parameterized
+from typing import Dict, List
+from bench_suite import BENCHMARKS, main, regressions, run
+
+
+class TestRegressionGate(unittest.TestCase):
+    """Test case for the baseline comparison of `bench_suite`.
+
+    Timings are made up, except for the end-to-end tests which run one
+    fast benchmark against a temporary baseline file.
+    """
+
+    @parameterized.expand([
+        ({"a": 1.1}, {"a": 1.0}, []),
+        ({"a": 1.3}, {"a": 1.0}, [("a", 1.0, 1.3)]),
+        ({"a": 0.5, "b": 9.0}, {"a": 1.0}, []),
+    ])
+    def test_regressions(self, results: Dict, baseline: Dict,
+                         expected: List) -> None:
+        """Test only benchmarks over the threshold are reported.
+
+        Args:
+            results (Dict): The new timings.
+            baseline (Dict): The stored timings.
+            expected (List): The expected regressions.
+        """
+        self.assertEqual(regressions(results, baseline, 0.2), expected)
+
+    def test_every_benchmark_runs(self) -> None:
+        """Test every registered benchmark sets up, runs and cleans up."""
+        for name in BENCHMARKS:
+            with self.subTest(name=name):
+                self.assertGreater(run(name, repeat=1, number=1), 0)
+
+    def test_save_then_gate(self) -> None:
+        """Test a saved baseline passes the gate and a faster one fails.
+
+        Asserts:
+            `main` returns 0 after saving and 1 once the stored timing
+            is made a thousand times faster.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baseline.json")
+            argv = ["memoize.cached", "--baseline", path, "--repeat", "1"]
+            with redirect_stdout(io.StringIO()) as out:
+                self.assertEqual(main(argv + ["--save"]), 0)
+                self.assertEqual(main(argv + ["--threshold", "100"]), 0)
+                with open(path) as f:
+                    baseline = json.load(f)
+                baseline["memoize.cached"] /= 1000
+                with open(path, "w") as f:
+                    json.dump(baseline, f)
+                self.assertEqual(main(argv + ["--confirm", "0"]), 1)
+        self.assertIn("REGRESSION memoize.cached", out.getvalue())
+
+    def test_gate_requires_baseline(self) -> None:
+        """Test gating without a saved baseline fails with a usage error."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "baseline.json")
+            with redirect_stderr(io.StringIO()) as err:
+                with self.assertRaises(SystemExit):
+                    main(["memoize.cached", "--baseline", path])
+        self.assertIn("run with --save", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Module for unit tests of the record/replay `Cassette`.
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+from cassette import Cassette, CassetteMiss, main
+from fixtures import load
+from stub_server import StubGitHubServer
+from utils import LRUCache, get_json
+
+
+class TestCassette(unittest.TestCase):
+    """Test case for the `Cassette` class.
+
+    Responses are recorded from the local GitHub API stub, which is
+    stopped before they are replayed.
+    """
+
+    def setUp(self) -> None:
+        """Pick a cassette file in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "github.cassette")
+
+    def test_replay_public_repos_offline(self) -> None:
+        """Test a recorded client run replays without the server.
+
+        Asserts:
+            The replayed repos match the fixture, the 3 repos pages and
+            the org are recorded, and identical bodies are stored once.
+        """
+        expected_repos, apache2_repos = load("google")[2:]
+        with StubGitHubServer(per_page=4) as stub:
+            with Cassette(self.path, mode="record") as cassette:
+                client = stub.client("google", session=cassette)
+                self.assertEqual(client.public_repos(), expected_repos)
+                stub.client("google", session=cassette).public_repos()
+        self.assertEqual(len(cassette.interactions), 8)
+        with Cassette(self.path) as cassette:
+            client = stub.client("google", session=cassette)
+            self.assertEqual(client.public_repos(), expected_repos)
+            self.assertEqual(client.public_repos("apache-2.0"),
+                             apache2_repos)
+            self.assertEqual(len({i.offset for i in cassette.interactions}),
+                             4)
+
+    def test_replays_revalidation(self) -> None:
+        """Test conditional requests replay their recorded `304`."""
+        with StubGitHubServer() as stub:
+            url = stub.url + "/orgs/google"
+            with Cassette(self.path, mode="record") as cassette:
+                cache = LRUCache()
+                expected = get_json(url, cassette, cache)
+                get_json(url, cassette, cache)
+        self.assertEqual([i.status for i in cassette.interactions],
+                         [200, 304])
+        with Cassette(self.path) as cassette:
+            cache = LRUCache()
+            self.assertEqual(get_json(url, cassette, cache), expected)
+            self.assertEqual(get_json(url, cassette, cache), expected)
+        self.assertEqual(cache.hits, 1)
+
+    def test_realtime_and_miss(self) -> None:
+        """Test realtime replay waits the recorded latency and unknown
+        requests raise `CassetteMiss`.
+        """
+        with StubGitHubServer() as stub:
+            url = stub.url + "/orgs/google"
+            with Cassette(self.path, mode="once") as cassette:
+                get_json(url, cassette)
+        elapsed = cassette.interactions[0].elapsed
+        with Cassette(self.path, mode="once", realtime=True) as cassette:
+            with patch('cassette.time.sleep') as sleep:
+                get_json(url, cassette)
+            sleep.assert_called_once_with(elapsed)
+            with self.assertRaises(CassetteMiss):
+                get_json(url + "/repos", cassette)
+
+    def test_cli(self) -> None:
+        """Test the listing shows each interaction."""
+        with StubGitHubServer() as stub:
+            url = stub.url + "/orgs/google"
+            with Cassette(self.path, mode="record") as cassette:
+                get_json(url, cassette)
+        with redirect_stdout(io.StringIO()) as out:
+            main([self.path])
+        status, _, size, listed = out.getvalue().split("\t")
+        self.assertEqual((status, listed.strip()), ("200", url))
+        self.assertEqual(int(size), cassette.interactions[0].length)
+
+
+if __name__ == "__main__":
+    unittest.main()
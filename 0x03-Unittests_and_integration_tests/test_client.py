@@ -2,13 +2,15 @@
 """
 Module for unittest to test the client.
 """
+import json
+import operator
 import unittest
-from unittest.mock import patch, Mock, PropertyMock, MagicMock
+from unittest.mock import patch, AsyncMock, Mock, PropertyMock, MagicMock
 from parameterized import parameterized, parameterized_class
 from typing import Dict
-from requests import HTTPError
-from client import GithubOrgClient
-from fixtures import TEST_PAYLOAD
+from requests import HTTPError, Response
+from client import AsyncGithubOrgClient, GithubOrgClient, fetch_many_orgs
+from fixtures import load, org_names
 
 
 class TestGithubOrgClient(unittest.TestCase):
@@ -35,10 +37,22 @@ class TestGithubOrgClient(unittest.TestCase):
         client = GithubOrgClient(org)
         result = client.org
         mock_get_json.assert_called_once_with(
-            f'https://api.github.com/orgs/{org}'
+            f'https://api.github.com/orgs/{org}', session=None
         )
         self.assertEqual(result, expected_resp)
 
+    def test_org_injected_session(self) -> None:
+        """
+        Test `GithubOrgClient.org` fetches through an injected session
+        instead of the shared default one.
+        """
+        session = Mock(**{'get.return_value.content': b'{"a": 1}'})
+        client = GithubOrgClient('google', session=session)
+        self.assertEqual(client.org, {'a': 1})
+        session.get.assert_called_once_with(
+            'https://api.github.com/orgs/google'
+        )
+
     def test_public_repos_url(self) -> None:
         """
         Test `_public_repos_url` property to ensure it returns the correct URL.
@@ -60,17 +74,18 @@ class TestGithubOrgClient(unittest.TestCase):
             expected_url = 'https://api.github.com/orgs/test_org/repos'
             self.assertEqual(result, expected_url)
 
-    @patch('client.get_json')
+    @patch('client.iter_json_pages')
     @patch(
         'client.GithubOrgClient._public_repos_url',
         new_callable=PropertyMock
     )
     def test_public_repos(self, mock_public_repos_url: PropertyMock,
-                          mock_get_json: MagicMock) -> None:
+                          mock_iter_json_pages: MagicMock) -> None:
         """
         Test `GithubOrgClient.public_repos` method to ensure it returns the
         correct list of repositories based on the mocked `_public_repos_url`
-        and `get_json`.
+        and `iter_json_pages`, streaming the pages until the repos payload
+        is memoized and reading the payload afterwards.
         """
         mock_payload = [
             {'name': 'repo1'},
@@ -79,17 +94,142 @@ class TestGithubOrgClient(unittest.TestCase):
         ]
         mock_url = 'https://api.github.com/orgs/test_org/repos'
         mock_public_repos_url.return_value = mock_url
-        mock_get_json.return_value = mock_payload
+        mock_iter_json_pages.side_effect = lambda *args, **kwargs: iter(
+            [mock_payload])
         client = GithubOrgClient('test_org')
         repos = client.public_repos()
         expected_repos = ['repo1', 'repo2', 'repo3']
         self.assertEqual(repos, expected_repos)
         mock_public_repos_url.assert_called_once()
-        mock_get_json.assert_called_once_with(mock_url)
+        mock_iter_json_pages.assert_called_once_with(
+            mock_url, session=None, stream=True)
+        self.assertEqual(client.repos_payload, mock_payload)
+        self.assertEqual(client.public_repos(), expected_repos)
+        self.assertEqual(mock_iter_json_pages.call_count, 2)
+        mock_iter_json_pages.assert_called_with(
+            mock_url, session=None, fields=None)
+
+    @patch('client.iter_json_pages')
+    @patch(
+        'client.GithubOrgClient._public_repos_url',
+        new_callable=PropertyMock
+    )
+    def test_iter_public_repos(self, mock_public_repos_url: PropertyMock,
+                               mock_iter_json_pages: MagicMock) -> None:
+        """
+        Test `GithubOrgClient.iter_public_repos` to ensure it yields repo
+        names across every page, applying the license filter lazily.
+        """
+        pages = [
+            [{'name': 'repo1', 'license': {'key': 'mit'}}],
+            [{'name': 'repo2'}, {'name': 'repo3', 'license': {'key': 'mit'}}],
+        ]
+        mock_public_repos_url.return_value = 'https://example.com/repos'
+        mock_iter_json_pages.return_value = iter(pages)
+        client = GithubOrgClient('test_org')
+        repos = client.iter_public_repos(license='mit')
+        self.assertEqual(next(repos), 'repo1')
+        self.assertEqual(list(repos), ['repo3'])
+        mock_iter_json_pages.assert_called_once_with(
+            'https://example.com/repos', session=None, stream=True)
+
+    @patch(
+        'client.GithubOrgClient.repos_payload',
+        new_callable=PropertyMock
+    )
+    def test_public_repos_license_index(
+            self, mock_repos_payload: PropertyMock) -> None:
+        """
+        Test `public_repos(license=...)` answers from an index built once
+        per payload, and rebuilds it when the payload is refreshed.
+        """
+        payload = [
+            {'name': 'repo1', 'license': {'key': 'mit'}},
+            {'name': 'repo2', 'license': None},
+            {'name': 'repo3', 'license': {'key': 'mit'}},
+        ]
+        mock_repos_payload.return_value = payload
+        client = GithubOrgClient('test_org')
+        self.assertEqual(client.public_repos('mit'), ['repo1', 'repo3'])
+        index = client.license_index
+        self.assertEqual(client.public_repos('apache-2.0'), [])
+        self.assertIs(client.license_index, index)
+        self.assertEqual(index[None], ['repo2'])
+        mock_repos_payload.return_value = payload[:1]
+        self.assertEqual(client.public_repos('mit'), ['repo1'])
+
+    @patch(
+        'client.GithubOrgClient.repos_payload',
+        new_callable=PropertyMock
+    )
+    def test_public_repos_by_license(
+            self, mock_repos_payload: PropertyMock) -> None:
+        """
+        Test `public_repos_by_license` and `group_by_license` partition
+        repos by license, including unlicensed ones, and apply field
+        predicates in the same pass.
+        """
+        mock_repos_payload.return_value = [
+            {'name': 'repo1', 'license': {'key': 'mit'}, 'forks': 5,
+             'private': False},
+            {'name': 'repo2', 'license': None, 'forks': 50,
+             'private': False},
+            {'name': 'repo3', 'license': {'key': 'mit'}, 'forks': 20,
+             'private': True},
+            {'name': 'repo4', 'license': {'key': 'bsd-3-clause'},
+             'forks': 30, 'private': False},
+        ]
+        client = GithubOrgClient('test_org')
+        self.assertEqual(
+            client.public_repos_by_license(['mit', 'apache-2.0', None]),
+            {'mit': ['repo1', 'repo3'], 'apache-2.0': [], None: ['repo2']},
+        )
+        self.assertEqual(
+            client.group_by_license(where={
+                'forks': lambda forks: forks > 10,
+                'private': operator.not_,
+            }),
+            {None: ['repo2'], 'bsd-3-clause': ['repo4']},
+        )
+        groups = client.group_by_license()
+        groups['mit'].append('mutated')
+        self.assertEqual(client.public_repos('mit'), ['repo1', 'repo3'])
+
+    @patch(
+        'client.GithubOrgClient.repos_payload',
+        new_callable=PropertyMock
+    )
+    def test_group_by_license_missing_field(
+            self, mock_repos_payload: PropertyMock) -> None:
+        """
+        Test a repo missing a `where` field fails its predicate instead of
+        passing None to it, and that a field dropped by `repo_fields` is
+        rejected.
+        """
+        mock_repos_payload.return_value = [
+            {'name': 'repo1', 'license': {'key': 'mit'}, 'forks': 50},
+            {'name': 'repo2', 'license': {'key': 'mit'}},
+        ]
+        client = GithubOrgClient('test_org')
+        self.assertEqual(
+            client.group_by_license(where={'forks': lambda f: f > 10}),
+            {'mit': ['repo1']},
+        )
+        projected = GithubOrgClient(
+            'test_org', repo_fields=GithubOrgClient.REPO_FIELDS)
+        self.assertEqual(
+            projected.group_by_license(
+                where={'license.key': lambda key: key == 'mit'}),
+            {'mit': ['repo1', 'repo2']},
+        )
+        with self.assertRaises(ValueError):
+            projected.group_by_license(where={'forks': lambda f: f > 10})
 
     @parameterized.expand([
         ({'license': {'key': 'bsd-3-clause'}}, 'bsd-3-clause', True),
         ({'license': {'key': 'bsl-1.0'}}, 'bsd-3-clause', False),
+        ({'license': None}, 'bsd-3-clause', False),
+        ({}, 'bsd-3-clause', False),
     ])
     def test_has_license(self, repo: Dict, key: str,
                          expected: bool) -> None:
@@ -107,34 +247,77 @@ class TestGithubOrgClient(unittest.TestCase):
         self.assertEqual(client_has_license, expected)
 
 
-@parameterized_class([
-    {
-        'org_payload': TEST_PAYLOAD[0][0],
-        'repos_payload': TEST_PAYLOAD[0][1],
-        'expected_repos': TEST_PAYLOAD[0][2],
-        'apache2_repos': TEST_PAYLOAD[0][3],
-    },
-])
+class TestGithubOrgClientSharedCache(unittest.TestCase):
+    """
+    Test case for the opt-in cache shared by `GithubOrgClient` instances.
+    """
+
+    def setUp(self) -> None:
+        """Enable a fresh shared cache for each test."""
+        GithubOrgClient.enable_shared_cache(maxsize=8, ttl=60)
+
+    def tearDown(self) -> None:
+        """Restore per-instance memoization."""
+        GithubOrgClient.disable_shared_cache()
+
+    @patch('client.iter_json_pages')
+    @patch('client.get_json')
+    def test_shared_across_instances(self, mock_get_json: MagicMock,
+                                     mock_iter_json_pages: MagicMock) -> None:
+        """
+        Test a new client for an already fetched org is served from the
+        shared cache for `org`, `repos_payload` and `public_repos`.
+        """
+        mock_get_json.return_value = {'repos_url': 'https://a.io/repos'}
+        mock_iter_json_pages.side_effect = lambda url, **kwargs: iter(
+            [[{'name': 'repo1'}]])
+        first = GithubOrgClient('google')
+        self.assertEqual(first.repos_payload, [{'name': 'repo1'}])
+        second = GithubOrgClient('google')
+        self.assertEqual(second.org, first.org)
+        self.assertEqual(second.public_repos(), ['repo1'])
+        self.assertEqual(second.repos_payload, [{'name': 'repo1'}])
+        mock_get_json.assert_called_once()
+        mock_iter_json_pages.assert_called_once()
+        GithubOrgClient('abc').org
+        self.assertEqual(mock_get_json.call_count, 2)
+
+
+@parameterized_class(
+    [{'org_name': org_name} for org_name in org_names()]
+)
 class TestIntegrationGithubOrgClient(unittest.TestCase):
     """
     Performs integration tests for the `GithubOrgClient` class.
+
+    Classes are parameterized by recorded org name only; each loads its
+    org's payloads in `setUpClass`, so collection does not read them.
     """
     @classmethod
     def setUpClass(cls) -> None:
         """
         Sets up class fixtures before running tests.
         """
+        (cls.org_payload, cls.repos_payload,
+         cls.expected_repos, cls.apache2_repos) = load(cls.org_name)
         route_payload = {
-            'https://api.github.com/orgs/google': cls.org_payload,
-            'https://api.github.com/orgs/google/repos': cls.repos_payload,
+            GithubOrgClient.ORG_URL.format(org=cls.org_name):
+                cls.org_payload,
+            cls.org_payload['repos_url']: cls.repos_payload,
         }
 
-        def get_payload(url):
+        def get_payload(url, **kwargs):
             if url in route_payload:
-                return Mock(**{'json.return_value': route_payload[url]})
+                response = Response()
+                response.status_code = 200
+                response._content = json.dumps(route_payload[url]).encode()
+                response._content_consumed = True
+                return response
             return HTTPError
 
-        cls.get_patcher = patch("requests.get", side_effect=get_payload)
+        cls.get_patcher = patch(
+            "requests.Session.get", side_effect=get_payload
+        )
         cls.get_patcher.start()
 
     def test_public_repos(self) -> None:
@@ -142,7 +325,7 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         Tests the `public_repos` method.
         """
         self.assertEqual(
-            GithubOrgClient("google").public_repos(),
+            GithubOrgClient(self.org_name).public_repos(),
             self.expected_repos,
         )
 
@@ -151,10 +334,23 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         Tests the `public_repos` method with a license.
         """
         self.assertEqual(
-            GithubOrgClient("google").public_repos(license="apache-2.0"),
+            GithubOrgClient(self.org_name).public_repos(
+                license="apache-2.0"),
             self.apache2_repos,
         )
 
+    def test_public_repos_projected(self) -> None:
+        """
+        Tests the `public_repos` method on projected `Repo` records.
+        """
+        client = GithubOrgClient(
+            self.org_name, repo_fields=GithubOrgClient.REPO_FIELDS)
+        self.assertEqual(client.public_repos(), self.expected_repos)
+        self.assertEqual(
+            client.public_repos(license="apache-2.0"), self.apache2_repos)
+        self.assertEqual(
+            set(client.repos_payload[0]), {"name", "license"})
+
     @classmethod
     def tearDownClass(cls) -> None:
         """
@@ -163,5 +359,92 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
         cls.get_patcher.stop()
 
 
+class TestAsyncGithubOrgClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Test case for the `AsyncGithubOrgClient` class.
+    """
+
+    @patch('client.async_get_json', new_callable=AsyncMock)
+    @patch('client.async_get_json_page', new_callable=AsyncMock)
+    async def test_public_repos(self, mock_get_json_page: AsyncMock,
+                                mock_get_json: AsyncMock) -> None:
+        """
+        Test `AsyncGithubOrgClient.public_repos` to ensure the remaining
+        pages advertised by the `last` link are fetched and concatenated in
+        page order, even when they complete out of order.
+        """
+        repos_url = 'https://api.github.com/orgs/test_org/repos'
+        pages = {
+            repos_url + '?page=2': [{'name': 'repo2'}],
+            repos_url + '?page=3': [
+                {'name': 'repo3', 'license': {'key': 'mit'}}
+            ],
+        }
+
+        def get_payload(url, **kwargs):
+            if url in pages:
+                return pages[url]
+            return {'repos_url': repos_url}
+
+        mock_get_json.side_effect = get_payload
+        mock_get_json_page.return_value = (
+            [{'name': 'repo1'}],
+            {'last': {'url': repos_url + '?page=3'}},
+        )
+        client = AsyncGithubOrgClient('test_org', concurrency=2)
+        self.assertEqual(
+            await client.public_repos(),
+            ['repo1', 'repo2', 'repo3'],
+        )
+        self.assertEqual(await client.public_repos(license='mit'), ['repo3'])
+        mock_get_json_page.assert_called_once_with(repos_url, session=None)
+        self.assertEqual(mock_get_json.call_count, 3)
+
+
+class TestFetchManyOrgs(unittest.TestCase):
+    """
+    Test case for the `fetch_many_orgs` function.
+    """
+
+    @patch('client.iter_json_pages')
+    @patch('client.get_json')
+    def test_fetch_many_orgs(self, mock_get_json: MagicMock,
+                             mock_iter_json_pages: MagicMock) -> None:
+        """
+        Test every distinct org is fetched once, orgs sharing a repos URL
+        share its fetch, and a failing org reports its error.
+        """
+        repos_urls = {
+            'google': 'https://a.io/shared/repos',
+            'alias': 'https://a.io/shared/repos',
+            'abc': 'https://a.io/abc/repos',
+        }
+
+        def get_org(url, **kwargs):
+            org = url.rsplit('/', 1)[1]
+            if org not in repos_urls:
+                raise HTTPError(url)
+            return {'repos_url': repos_urls[org]}
+
+        mock_get_json.side_effect = get_org
+        mock_iter_json_pages.side_effect = lambda url, **kwargs: iter([[
+            {'name': url.split('/')[3], 'license': {'key': 'mit'}},
+            {'name': 'other'},
+        ]])
+        results = {
+            result.org: result for result in fetch_many_orgs(
+                ['google', 'alias', 'abc', 'google', 'missing'],
+                license='mit', concurrency=3)
+        }
+        self.assertEqual(mock_get_json.call_count, 4)
+        self.assertEqual(mock_iter_json_pages.call_count, 2)
+        self.assertEqual(results['google'].repos, ['shared'])
+        self.assertEqual(results['alias'].repos, ['shared'])
+        self.assertEqual(results['abc'].repos, ['abc'])
+        self.assertIsNone(results['missing'].repos)
+        self.assertIsInstance(results['missing'].error, HTTPError)
+        self.assertTrue(all(r.elapsed >= 0 for r in results.values()))
+
+
 if __name__ == '__main__':
     unittest.main()
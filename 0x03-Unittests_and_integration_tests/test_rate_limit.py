@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Module for unit tests of the `RateLimitScheduler`.
+"""
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch, Mock
+from parameterized import parameterized
+from requests import Response
+from typing import Dict, List
+from rate_limit import RateLimitScheduler
+from utils import get_json, make_session, set_scheduler
+
+
+def make_response(status: int, headers: Dict = None) -> Response:
+    """Build a `requests.Response` as returned by a session."""
+    response = Response()
+    response.status_code = status
+    response._content = b"[]"
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+    """Test case for the `RateLimitScheduler` class.
+
+    Time is frozen and `time.sleep` is mocked, so the tests check the
+    waits the scheduler asks for rather than waiting.
+    """
+
+    def setUp(self) -> None:
+        """Freeze the clocks and capture sleeps."""
+        patcher = patch('rate_limit.time')
+        self.time = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.time.monotonic.return_value = 100.0
+        self.time.time.return_value = 1000.0
+
+    def sleeps(self) -> List[float]:
+        """Return the seconds passed to every `time.sleep` call."""
+        return [call.args[0] for call in self.time.sleep.call_args_list]
+
+    def test_token_bucket_spacing(self) -> None:
+        """Test requests beyond the burst are spaced at `rate`."""
+        scheduler = RateLimitScheduler(rate=2, burst=2)
+        waits = [scheduler.acquire() for _ in range(4)]
+        self.assertEqual(waits, [0, 0, 0.5, 1.0])
+
+    def test_spreads_remaining_quota(self) -> None:
+        """Test the rate drops to the quota left until its reset."""
+        scheduler = RateLimitScheduler(rate=100, burst=1)
+        scheduler.update(make_response(200, {
+            "X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1100",
+        }))
+        scheduler.acquire()
+        self.assertEqual(scheduler.acquire(), 10.0)
+
+    def test_waits_for_quota_reset(self) -> None:
+        """Test an exhausted quota waits until the reset time."""
+        scheduler = RateLimitScheduler()
+        scheduler.update(make_response(200, {
+            "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1030",
+        }))
+        self.assertEqual(scheduler.acquire(), 30.0)
+        self.assertEqual(scheduler.acquire(), 30.0)
+        self.time.time.return_value = 1030.0
+        self.assertEqual(scheduler.acquire(), 0)
+        self.assertIsNone(scheduler.remaining)
+
+    def test_concurrent_callers_wait_for_reset(self) -> None:
+        """Test every concurrent caller waits for an exhausted quota."""
+        scheduler = RateLimitScheduler()
+        scheduler.update(make_response(200, {
+            "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1001",
+        }))
+        waits = []
+        threads = [
+            threading.Thread(target=lambda: waits.append(scheduler.acquire()))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(waits, [1.0] * 4)
+
+    @parameterized.expand([
+        (429, {"Retry-After": "7"}, 7.0),
+        (403, {"Retry-After": "3"}, 3.0),
+        (403, {"X-RateLimit-Remaining": "0",
+               "X-RateLimit-Reset": "1012"}, 12.0),
+    ])
+    def test_retries_throttled(self, status: int, headers: Dict,
+                               delay: float) -> None:
+        """Test a throttled request is retried after the advertised delay.
+
+        Args:
+            status (int): The status of the throttled response.
+            headers (Dict): Its rate limit headers.
+            delay (float): The expected wait before the retry.
+        """
+        scheduler = RateLimitScheduler()
+        request = Mock(side_effect=[
+            make_response(status, headers), make_response(200),
+        ])
+        self.assertEqual(scheduler.send(request).status_code, 200)
+        self.assertEqual(request.call_count, 2)
+        self.assertIn(delay, self.sleeps())
+        self.assertEqual(scheduler.retries, 1)
+
+    def test_backoff_on_server_errors(self) -> None:
+        """Test 5xx responses back off with capped, jittered delays.
+
+        Asserts:
+            The last response is returned once retries are exhausted.
+        """
+        scheduler = RateLimitScheduler(max_retries=3, backoff=1,
+                                       max_backoff=3)
+        request = Mock(return_value=make_response(503))
+        with patch('rate_limit.random.uniform',
+                   side_effect=lambda low, high: high) as uniform:
+            self.assertEqual(scheduler.send(request).status_code, 503)
+        self.assertEqual(request.call_count, 4)
+        self.assertEqual(
+            [call.args for call in uniform.call_args_list],
+            [(0, 1), (0, 2), (0, 3)],
+        )
+
+    def test_no_retry_when_forbidden(self) -> None:
+        """Test a plain 403 is returned without retrying."""
+        request = Mock(return_value=make_response(403))
+        self.assertEqual(RateLimitScheduler().send(request).status_code, 403)
+        request.assert_called_once()
+
+
+class TestRateLimitStubServer(unittest.TestCase):
+    """Test `get_json` retries against a local stub server that throttles
+    its first request.
+    """
+
+    def test_get_json_retries(self) -> None:
+        """Test `get_json` returns the payload served after a 429."""
+        statuses = [429, 200]
+        seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answer with the next status from `statuses`."""
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                """Serve a throttled or successful response."""
+                status = statuses.pop(0)
+                seen.append(status)
+                body = json.dumps({"status": status}).encode()
+                self.send_response(status)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args) -> None:
+                """Silence per-request logging."""
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        set_scheduler(RateLimitScheduler())
+        session = make_session()
+        try:
+            url = "http://127.0.0.1:{}/".format(server.server_port)
+            self.assertEqual(get_json(url, session), {"status": 200})
+        finally:
+            set_scheduler(None)
+            session.close()
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(seen, [429, 200])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Module for unit tests of the persistent `SQLiteCache`.
+"""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import patch, Mock
+from requests import Response
+from sqlite_cache import SQLiteCache, main
+from utils import CachedResponse, METRICS, enable_metrics, get_json
+
+
+class TestSQLiteCache(unittest.TestCase):
+    """Test case for the `SQLiteCache` class.
+
+    This class tests that entries survive reopening the database, expire
+    after their TTL and are evicted beyond the size caps.
+    """
+
+    def setUp(self) -> None:
+        """Create a cache file in a temporary directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "cache.sqlite")
+
+    def tearDown(self) -> None:
+        """Remove the temporary directory."""
+        self.tmpdir.cleanup()
+
+    def test_persists_across_instances(self) -> None:
+        """Test an entry written by one cache is read by the next.
+
+        Asserts:
+            A reopened cache revalidates with the stored ETag and serves
+            the stored body on `304 Not Modified`.
+        """
+        cache = SQLiteCache(self.path)
+        cache.set("http://a.io", CachedResponse(b'{"v": 1}', {"ETag": "x"}))
+        cache.close()
+        not_modified = Response()
+        not_modified.status_code = 304
+        not_modified._content = b""
+        not_modified._content_consumed = True
+        session = Mock(**{'get.return_value': not_modified})
+        reopened = SQLiteCache(self.path)
+        self.assertEqual(get_json("http://a.io", session, reopened), {"v": 1})
+        session.get.assert_called_once_with(
+            "http://a.io", headers={"If-None-Match": "x"})
+        self.assertEqual((reopened.hits, reopened.misses), (1, 0))
+        reopened.close()
+
+    def test_ttl(self) -> None:
+        """Test entries are fresh within the TTL, stale after it, and
+        purged once stale.
+        """
+        cache = SQLiteCache(self.path, ttl=10)
+        with patch('sqlite_cache.time.time', return_value=1000.0) as clock:
+            cache.set("http://a.io", CachedResponse(b'[]', {}))
+            clock.return_value = 1005.0
+            self.assertTrue(cache.get("http://a.io").fresh)
+            clock.return_value = 1011.0
+            self.assertFalse(cache.get("http://a.io").fresh)
+            self.assertEqual(cache.purge_expired(), 1)
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+    def test_fresh_served_without_request(self) -> None:
+        """Test a restarted process serves entries within the TTL without
+        a request and revalidates older ones.
+
+        Asserts:
+            A `304` on revalidation makes the entry fresh again.
+        """
+        cache = SQLiteCache(self.path, ttl=10)
+        with patch('sqlite_cache.time.time', return_value=1000.0) as clock:
+            cache.set("http://a.io", CachedResponse(b'[1]', {"ETag": "x"}))
+            cache.close()
+            not_modified = Response()
+            not_modified.status_code = 304
+            not_modified._content = b""
+            not_modified._content_consumed = True
+            session = Mock(**{'get.return_value': not_modified})
+            reopened = SQLiteCache(self.path, ttl=10)
+            clock.return_value = 1005.0
+            self.assertEqual(get_json("http://a.io", session, reopened), [1])
+            session.get.assert_not_called()
+            clock.return_value = 1020.0
+            self.assertEqual(get_json("http://a.io", session, reopened), [1])
+            session.get.assert_called_once_with(
+                "http://a.io", headers={"If-None-Match": "x"})
+            self.assertTrue(reopened.get("http://a.io").fresh)
+        reopened.close()
+
+    def test_fresh_counted_as_hits(self) -> None:
+        """Test entries served within the TTL count as response cache
+        hits in the metrics.
+        """
+        cache = SQLiteCache(self.path, ttl=60)
+        urls = ["http://a.io/{}".format(i) for i in range(3)]
+        for url in urls:
+            cache.set(url, CachedResponse(b'[1]', {"ETag": "x"}))
+        session = Mock()
+        enable_metrics()
+        self.addCleanup(METRICS.reset)
+        self.addCleanup(enable_metrics, False)
+        for url in urls:
+            self.assertEqual(get_json(url, session, cache), [1])
+        session.get.assert_not_called()
+        metrics = METRICS.as_dict()
+        self.assertEqual(metrics["counters"]["response_cache_total"],
+                         {'{result="fresh"}': 3})
+        self.assertEqual(metrics["cache_hit_ratio"], {"response": 1.0})
+        cache.close()
+
+    def test_size_caps(self) -> None:
+        """Test least recently used entries are evicted beyond the caps."""
+        cache = SQLiteCache(self.path, max_entries=2, max_bytes=10)
+        with patch('sqlite_cache.time.time', return_value=1.0) as clock:
+            for url in ("a", "b", "c"):
+                clock.return_value += 1
+                cache.set(url, CachedResponse(b'1234', {}))
+            self.assertEqual([e[0] for e in cache.entries()], ["b", "c"])
+            clock.return_value += 1
+            cache.get("b")
+            clock.return_value += 1
+            cache.set("d", CachedResponse(b'12345678', {}))
+        self.assertEqual([e[0] for e in cache.entries()], ["d"])
+        cache.close()
+
+    def test_cli(self) -> None:
+        """Test the `stats` and `purge` commands."""
+        cache = SQLiteCache(self.path)
+        cache.set("http://a.io", CachedResponse(b'[1]', {}))
+        cache.close()
+        out = io.StringIO()
+        with redirect_stdout(out):
+            main([self.path, "stats"])
+            main([self.path, "purge"])
+            main([self.path, "stats"])
+        self.assertEqual(
+            out.getvalue().splitlines(),
+            ["entries: 1", "bytes: 3", "purged 1 entries",
+             "entries: 0", "bytes: 0"],
+        )
+
+    def test_cli_expired_requires_ttl(self) -> None:
+        """Test `purge --expired` without `--ttl` is rejected."""
+        with redirect_stderr(io.StringIO()) as err:
+            with self.assertRaises(SystemExit):
+                main([self.path, "purge", "--expired"])
+        self.assertIn("--expired requires --ttl", err.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
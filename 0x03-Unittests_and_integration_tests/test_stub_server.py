@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Module for tests of the local GitHub API stub and its load driver.
+"""
+import unittest
+from fixtures import load
+from load_test import run_load
+from stub_server import StubGitHubServer
+from utils import LRUCache, get_json, make_session
+
+
+class TestStubGitHubServer(unittest.TestCase):
+    """Test case for the `StubGitHubServer` class.
+
+    Every test talks to the stub over real HTTP through a pooled session.
+    """
+
+    def setUp(self) -> None:
+        """Open a session to talk to the stub."""
+        self.session = make_session()
+        self.addCleanup(self.session.close)
+
+    def test_public_repos_paginated(self) -> None:
+        """Test a client reads every fixture repo across pages.
+
+        Asserts:
+            With 4 repos per page the 9 fixture repos take 3 page
+            requests, plus one for the org.
+        """
+        expected_repos, apache2_repos = load("google")[2:]
+        with StubGitHubServer(per_page=4) as stub:
+            client = stub.client("google", session=self.session)
+            self.assertEqual(client.public_repos(), expected_repos)
+            self.assertEqual(stub.requests, 4)
+            self.assertEqual(client.public_repos("apache-2.0"),
+                             apache2_repos)
+
+    def test_etag_revalidation(self) -> None:
+        """Test a cached response is revalidated with `304`."""
+        cache = LRUCache()
+        with StubGitHubServer() as stub:
+            url = stub.url + "/orgs/google"
+            first = get_json(url, self.session, cache)
+            self.assertEqual(get_json(url, self.session, cache), first)
+        self.assertEqual(first["repos_url"], url + "/repos")
+        self.assertEqual(cache.hits, 1)
+
+    def test_rate_limit(self) -> None:
+        """Test requests beyond the limit are refused with `403`."""
+        with StubGitHubServer(rate_limit=1) as stub:
+            url = stub.url + "/orgs/google"
+            ok = self.session.get(url)
+            throttled = self.session.get(url)
+        self.assertEqual(ok.headers["X-RateLimit-Remaining"], "0")
+        self.assertEqual(throttled.status_code, 403)
+
+    def test_unknown_org(self) -> None:
+        """Test an unknown org is answered with `404`."""
+        with StubGitHubServer() as stub:
+            response = self.session.get(stub.url + "/orgs/nobody")
+        self.assertEqual(response.status_code, 404)
+
+    def test_run_load(self) -> None:
+        """Test the load driver counts calls and stub requests.
+
+        Asserts:
+            Each call needs at most an org and a repos request; identical
+            concurrent requests may be coalesced into one.
+        """
+        with StubGitHubServer() as stub:
+            result = run_load(stub, "public_repos", callers=2, calls=3)
+        self.assertEqual(result.calls, 6)
+        self.assertTrue(0 < result.requests <= 12)
+        self.assertLessEqual(result.p50, result.p99)
+        self.assertGreater(result.peak_bytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
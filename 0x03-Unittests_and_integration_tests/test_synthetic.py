@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Module for unit tests of the synthetic payload generator.
+"""
+import io
+import json
+import unittest
+from parameterized import parameterized
+from typing import Dict, Optional
+from client import GithubOrgClient
+from fixtures import load
+from synthetic import MISSING, generate_org, generate_repos, write_repos
+
+
+class TestGenerateRepos(unittest.TestCase):
+    """Test case for `generate_repos` and its helpers.
+
+    This class tests that the generated repos are reproducible, keep the
+    fixture repo shape and follow the requested license distribution.
+    """
+
+    def test_deterministic(self) -> None:
+        """Test the same seed yields the same repos and another differs."""
+        self.assertEqual(list(generate_repos(20, seed=3)),
+                         list(generate_repos(20, seed=3)))
+        self.assertNotEqual(list(generate_repos(20, seed=3)),
+                            list(generate_repos(20, seed=4)))
+
+    def test_fixture_shape(self) -> None:
+        """Test repos keep the fixture keys, renamed and re-owned.
+
+        Asserts:
+            Every URL names the new repo and the owner is the new org.
+        """
+        repo = next(generate_repos(1, org="acme", licenses={"mit": 1}))
+        self.assertEqual(set(repo), set(load("google").repos[0]))
+        self.assertEqual(repo["full_name"], "acme/episodes.dart-0")
+        self.assertEqual(repo["owner"]["login"], "acme")
+        self.assertTrue(repo["url"].endswith("/repos/acme/episodes.dart-0"))
+        self.assertEqual(repo["license"]["key"], "mit")
+
+    @parameterized.expand([
+        ({"apache-2.0": 1}, "apache-2.0", True),
+        ({None: 1}, None, False),
+        ({MISSING: 1}, MISSING, False),
+    ])
+    def test_license_distribution(self, licenses: Dict,
+                                  key: Optional[str],
+                                  apache2: bool) -> None:
+        """Test licenses are drawn from the given weights.
+
+        Args:
+            licenses (Dict): The license weights.
+            key (Optional[str]): The only license key they allow.
+            apache2 (bool): Whether `has_license` finds `apache-2.0`.
+        """
+        for repo in generate_repos(10, licenses=licenses):
+            if key == MISSING:
+                self.assertNotIn("license", repo)
+            elif key is None:
+                self.assertIsNone(repo["license"])
+            else:
+                self.assertEqual(repo["license"]["key"], key)
+            self.assertEqual(
+                GithubOrgClient.has_license(repo, "apache-2.0"), apache2)
+
+    def test_fixtures_untouched(self) -> None:
+        """Test generating repos leaves the fixture template unchanged."""
+        before = json.dumps(load("google"))
+        for repo in generate_repos(20, licenses={MISSING: 1}):
+            repo["owner"]["login"] = repo["permissions"]["admin"] = "x"
+        self.assertEqual(json.dumps(load("google")), before)
+
+    def test_write_repos(self) -> None:
+        """Test the streamed listing decodes to the generated repos."""
+        out = io.StringIO()
+        size = write_repos(out, 12, seed=7)
+        self.assertEqual(size, len(out.getvalue()))
+        self.assertEqual(json.loads(out.getvalue()),
+                         generate_org(12, seed=7)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,11 +8,42 @@ module. The tests include:
 - Caching results using the memoize decorator.
 """
 
+import asyncio
+import gc
+import json
+import threading
 import unittest
+import weakref
 from unittest.mock import patch, Mock
 from parameterized import parameterized
+from requests import Response
 from typing import Dict, Tuple, Union
-from utils import access_nested_map, get_json, memoize
+from utils import (
+    JSON_BACKENDS,
+    LRUCache,
+    METRICS,
+    access_nested_map,
+    async_get_json,
+    async_memoize,
+    coalescing_stats,
+    compile_path,
+    enable_metrics,
+    extract_paths,
+    get_json,
+    get_json_backend,
+    get_session,
+    iter_json_array,
+    iter_json_pages,
+    last_page_number,
+    make_record_type,
+    make_session,
+    memoize,
+    set_coalescing,
+    set_json_backend,
+    set_session,
+    stream_json_array,
+    with_page,
+)
 
 
 class TestAccessNestedMap(unittest.TestCase):
@@ -69,6 +100,106 @@ class TestAccessNestedMap(unittest.TestCase):
             access_nested_map(nested_map, path)
 
 
+class TestCompilePath(unittest.TestCase):
+    """Test case for the `compile_path` function.
+
+    This class tests that compiled getters agree with `access_nested_map`
+    and return the default instead of raising when one is given.
+    """
+
+    @parameterized.expand([
+        ({"a": 1}, ("a",), 1),
+        ({"a": {"b": 2}}, ("a",), {"b": 2}),
+        ({"a": {"b": 2}}, ("a", "b"), 2),
+        ({"a": {"b": 2}}, (), {"a": {"b": 2}}),
+    ])
+    def test_compile_path(self, nested_map: Dict, path: Tuple[str],
+                          expected: Union[Dict, int]) -> None:
+        """Test a compiled getter returns the value at the path."""
+        self.assertEqual(compile_path(path)(nested_map), expected)
+        self.assertEqual(compile_path(path, default=0)(nested_map), expected)
+
+    @parameterized.expand([
+        ({}, ("a",), "a"),
+        ({"a": 1}, ("a", "b"), "b"),
+        ({"a": None}, ("a", "b"), "b"),
+    ])
+    def test_compile_path_missing(self, nested_map: Dict, path: Tuple[str],
+                                  missing_key: str) -> None:
+        """Test a missing path raises KeyError or returns the default.
+
+        Args:
+            nested_map (Dict): The nested dictionary to traverse.
+            path (Tuple[str]): A tuple of keys that does not resolve.
+            missing_key (str): The key reported by the KeyError.
+        """
+        with self.assertRaises(KeyError) as error:
+            compile_path(path)(nested_map)
+        self.assertEqual(error.exception.args, (missing_key,))
+        self.assertIsNone(compile_path(path, default=None)(nested_map))
+
+
+class TestExtractPaths(unittest.TestCase):
+    """Test case for the `extract_paths` function."""
+
+    def test_extract_paths(self) -> None:
+        """Test columns are extracted for dotted and sequence paths.
+
+        Asserts:
+            Missing or non-mapping intermediate values yield the default,
+            and records are only iterated once.
+        """
+        records = iter([
+            {"name": "a", "license": {"key": "mit"}, "forks": 3},
+            {"name": "b", "license": None},
+            {"name": "c", "owner": {"login": "x"}},
+        ])
+        columns = extract_paths(
+            records, ["name", "license.key", ("owner", "login"), "forks"],
+            default=-1,
+        )
+        self.assertEqual(columns, {
+            "name": ["a", "b", "c"],
+            "license.key": ["mit", -1, -1],
+            ("owner", "login"): [-1, -1, "x"],
+            "forks": [3, -1, -1],
+        })
+
+
+class TestRecord(unittest.TestCase):
+    """Test case for the compact records of `make_record_type`."""
+
+    def test_projection(self) -> None:
+        """Test a record keeps only the configured (nested) fields.
+
+        Asserts:
+            The record reads like the projected dict, has no `__dict__`,
+            is read-only and works with `compile_path`.
+        """
+        Repo = make_record_type("Repo", ("license.key", "name", "owner"))
+        repo = Repo.from_mapping({
+            "name": "a", "id": 1, "owner": {"login": "x"},
+            "license": {"key": "mit", "name": "MIT License"},
+        })
+        self.assertEqual(
+            repo,
+            {"name": "a", "owner": {"login": "x"}, "license": {"key": "mit"}},
+        )
+        self.assertFalse(hasattr(repo, "__dict__"))
+        self.assertEqual(compile_path(("license", "key"))(repo), "mit")
+        with self.assertRaises(AttributeError):
+            repo.name = "b"
+
+    def test_missing_fields(self) -> None:
+        """Test absent or null fields stay absent or null."""
+        Repo = make_record_type("Repo", ("license.key", "name"))
+        repo = Repo.from_mapping({"license": None})
+        self.assertEqual(dict(repo), {"license": None})
+        with self.assertRaises(KeyError):
+            repo["name"]
+        self.assertIs(make_record_type("Repo", ("license.key", "name")), Repo)
+
+
 class TestGetJson(unittest.TestCase):
     """Test case for the `get_json` function.
 
@@ -94,15 +225,513 @@ class TestGetJson(unittest.TestCase):
 
         Asserts:
             The function output matches the expected payload and
-            `requests.get` is called with the correct URL.
+            the shared session's `get` is called with the correct URL.
         """
-        attrs = {'json.return_value': test_payload}
+        attrs = {'content': json.dumps(test_payload).encode()}
         with patch(
-            'utils.requests.get',
-            return_value=Mock(**attrs)
-        ) as req_get:
+            'utils.get_session',
+            return_value=Mock(**{'get.return_value': Mock(**attrs)})
+        ) as get_session:
             self.assertEqual(get_json(test_url), test_payload)
-            req_get.assert_called_once_with(test_url)
+            get_session.return_value.get.assert_called_once_with(test_url)
+
+    @parameterized.expand([
+        (body, expected, structs)
+        for body, expected in [
+            (b'[{"name": "a", "id": 1, "license": {"key": "mit", "x": 2}}]',
+             [{"name": "a", "license": {"key": "mit"}}]),
+            (b'{"name": "a", "id": 1}', {"name": "a"}),
+            (b'[{"name": "a", "license": null}, {"name": "b"}]',
+             [{"name": "a", "license": None}, {"name": "b"}]),
+            (b'[{"name": "a", "license": "mit"}]',
+             [{"name": "a", "license": "mit"}]),
+        ]
+        for structs in (True, False)
+    ])
+    def test_get_json_fields(self, body: bytes, expected: Union[list, Dict],
+                             structs: bool) -> None:
+        """Test `get_json` projects decoded objects onto `fields`.
+
+        Args:
+            body (bytes): The JSON body served.
+            expected (Union[list, Dict]): The projected payload.
+            structs (bool): Whether msgspec structs may be used, or the
+                body is decoded whole and projected afterwards.
+        """
+        session = Mock(**{'get.return_value': make_response(200, body)})
+        if not structs:
+            patcher = patch('utils._struct_decoder', return_value=None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        payload = get_json("http://a.io", session,
+                           fields={"name", "license.key"})
+        self.assertEqual(payload, expected)
+
+    @unittest.skipUnless("msgspec" in JSON_BACKENDS, "msgspec not installed")
+    def test_get_json_fields_structs(self) -> None:
+        """Test projected bodies are decoded by msgspec whatever the
+        selected backend.
+        """
+        session = Mock(**{'get.return_value': make_response(
+            200, b'[{"name": "a", "id": 1}]')})
+        enable_metrics()
+        self.addCleanup(METRICS.reset)
+        self.addCleanup(enable_metrics, False)
+        self.assertEqual(get_json("http://a.io", session, fields={"name"}),
+                         [{"name": "a"}])
+        self.assertEqual(
+            list(METRICS.as_dict()["histograms"]["json_decode_seconds"]),
+            ['{backend="msgspec"}'])
+
+    def test_get_json_injected_session(self) -> None:
+        """Test `get_json` uses an injected session over the shared one.
+
+        Asserts:
+            The shared session is never created or used.
+        """
+        session = Mock(**{'get.return_value.content': b'[1]'})
+        with patch('utils.get_session') as get_session:
+            self.assertEqual(get_json("http://a.io", session=session), [1])
+            get_session.assert_not_called()
+        session.get.assert_called_once_with("http://a.io")
+
+
+def make_response(status: int, body: bytes = b"",
+                  headers: Dict = None) -> Response:
+    """Build a `requests.Response` as returned by a session."""
+    response = Response()
+    response.status_code = status
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    return response
+
+
+class TestLRUCache(unittest.TestCase):
+    """Test case for the `LRUCache` mapping."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test entries beyond `maxsize` evict the least recently used."""
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+        cache.delete("a")
+        self.assertEqual(cache.get("a", "missing"), "missing")
+
+
+class TestConditionalGetJson(unittest.TestCase):
+    """Test case for `get_json` revalidating against a response cache.
+
+    This class tests that validators are stored, sent back as conditional
+    request headers, and that `304 Not Modified` is served from cache.
+    """
+
+    @parameterized.expand([
+        ({"ETag": '"abc"'}, {"If-None-Match": '"abc"'}),
+        ({"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+         {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+    ])
+    def test_revalidates(self, validators: Dict, expected: Dict) -> None:
+        """Test a cached body is revalidated and served on `304`.
+
+        Args:
+            validators (Dict): Validator headers of the first response.
+            expected (Dict): Conditional headers expected on revalidation.
+        """
+        session = Mock(**{'get.side_effect': [
+            make_response(200, b'{"v": 1}', validators),
+            make_response(304),
+        ]})
+        cache = LRUCache()
+        url = "http://example.com"
+        self.assertEqual(get_json(url, session, cache), {"v": 1})
+        session.get.assert_called_once_with(url)
+        self.assertEqual(get_json(url, session, cache), {"v": 1})
+        session.get.assert_called_with(url, headers=expected)
+
+    def test_releases_not_modified(self) -> None:
+        """Test a streamed `304` is closed, returning its connection to
+        the pool, and the cached body is served instead.
+        """
+        not_modified = make_response(304)
+        not_modified.close = Mock()
+        session = Mock(**{'get.side_effect': [
+            make_response(200, b'[1]', {"ETag": '"a"'}), not_modified,
+        ]})
+        cache = LRUCache()
+        get_json("http://a.io", session, cache)
+        pages = iter_json_pages("http://a.io", session, cache, stream=True)
+        self.assertEqual([list(page) for page in pages], [[1]])
+        not_modified.close.assert_called_once_with()
+
+    def test_refreshes_modified(self) -> None:
+        """Test a `200` on revalidation replaces the cached body."""
+        session = Mock(**{'get.side_effect': [
+            make_response(200, b'[1]', {"ETag": '"a"'}),
+            make_response(200, b'[2]', {"ETag": '"b"'}),
+        ]})
+        cache = LRUCache()
+        get_json("http://a.io", session, cache)
+        self.assertEqual(get_json("http://a.io", session, cache), [2])
+        self.assertEqual(cache.get("http://a.io").headers, {"ETag": '"b"'})
+
+    def test_skips_unvalidated(self) -> None:
+        """Test responses without validators are never cached."""
+        session = Mock(**{
+            'get.return_value': make_response(200, b'[1]'),
+        })
+        cache = LRUCache()
+        get_json("http://a.io", session, cache)
+        self.assertEqual(len(cache), 0)
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Test case for the incremental `iter_json_array` decoder.
+
+    This class tests that elements are decoded across arbitrary chunk
+    boundaries, including inside multi-byte characters and numbers.
+    """
+
+    PAYLOAD = [{"name": "caf\u00e9", "license": None}, 12345, "a,]",
+               [1, [2]], True, -0.5]
+
+    @parameterized.expand([(1,), (3,), (7,), (4096,)])
+    def test_chunk_sizes(self, size: int) -> None:
+        """Test decoding gives the same elements for any chunk size.
+
+        Args:
+            size (int): The number of bytes per chunk.
+        """
+        body = json.dumps(self.PAYLOAD, ensure_ascii=False).encode()
+        chunks = [body[i:i + size] for i in range(0, len(body), size)]
+        self.assertEqual(list(iter_json_array(chunks)), self.PAYLOAD)
+
+    def test_yields_before_end(self) -> None:
+        """Test an element is yielded before the rest has arrived."""
+        elements = iter_json_array(iter([b' [ {"a": 1}, ', b'{"b"']))
+        self.assertEqual(next(elements), {"a": 1})
+        with self.assertRaises(json.JSONDecodeError):
+            next(elements)
+
+    @parameterized.expand([
+        (b"[]", []),
+        (b"\n[ ]\n", []),
+    ])
+    def test_empty(self, body: bytes, expected: list) -> None:
+        """Test empty arrays decode to nothing."""
+        self.assertEqual(list(iter_json_array([body])), expected)
+
+    @parameterized.expand([
+        (b"{}",),
+        (b"[1 2]",),
+        (b"[1,]",),
+        (b"[1]]",),
+        (b"[1",),
+    ])
+    def test_invalid(self, body: bytes) -> None:
+        """Test malformed or non-array documents raise JSONDecodeError."""
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_json_array([body]))
+
+    def test_stream_json_array(self) -> None:
+        """Test `stream_json_array` streams and closes the response."""
+        response = make_response(200, b'[{"name": "a"}, {"name": "b"}]')
+        response.close = Mock()
+        session = Mock(**{'get.return_value': response})
+        names = [repo["name"] for repo in stream_json_array("http://a.io",
+                                                            session)]
+        self.assertEqual(names, ["a", "b"])
+        session.get.assert_called_once_with("http://a.io", stream=True)
+        response.close.assert_called_once()
+
+
+class TestJsonBackend(unittest.TestCase):
+    """Test case for the pluggable JSON decoding backends."""
+
+    def setUp(self) -> None:
+        """Remember the backend in use."""
+        self.backend = get_json_backend()
+
+    def tearDown(self) -> None:
+        """Restore the backend in use."""
+        set_json_backend(self.backend)
+
+    @parameterized.expand([(name,) for name in JSON_BACKENDS])
+    def test_backend(self, name: str) -> None:
+        """Test every installed backend decodes response bytes alike.
+
+        Args:
+            name (str): The backend to select.
+        """
+        set_json_backend(name)
+        self.assertEqual(get_json_backend(), name)
+        session = Mock(**{'get.return_value.content':
+                          '{"name": "caf\u00e9", "n": [1, 2.5]}'.encode()})
+        self.assertEqual(get_json("http://a.io", session),
+                         {"name": "caf\u00e9", "n": [1, 2.5]})
+
+    def test_missing_backend(self) -> None:
+        """Test selecting a backend that is not installed raises."""
+        with self.assertRaises(ValueError):
+            set_json_backend("simdjson")
+        self.assertEqual(list(JSON_BACKENDS)[-1], "json")
+
+
+class TestCoalescing(unittest.TestCase):
+    """Test case for sharing identical in-flight `get_json` requests."""
+
+    def test_threads_share_request(self) -> None:
+        """Test concurrent threads share one request but decode apart.
+
+        Asserts:
+            The session is called once, every thread gets the payload as
+            its own object, and the saved requests are counted.
+        """
+        release = threading.Event()
+
+        def get(url, **kwargs):
+            release.wait()
+            return make_response(200, b'{"v": 1}')
+
+        session = Mock(**{'get.side_effect': get})
+        before = coalescing_stats()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                get_json("http://a.io", session)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while coalescing_stats()["coalesced"] - before["coalesced"] < 4:
+            release.wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        session.get.assert_called_once_with("http://a.io")
+        self.assertEqual(results, [{"v": 1}] * 5)
+        self.assertIsNot(results[0], results[1])
+        after = coalescing_stats()
+        self.assertEqual(after["requests"] - before["requests"], 1)
+        self.assertEqual(after["coalesced"] - before["coalesced"], 4)
+
+    def test_disabled(self) -> None:
+        """Test every call sends its own request when disabled."""
+        set_coalescing(False)
+        self.addCleanup(set_coalescing, True)
+        session = Mock(**{'get.return_value': make_response(200, b'1')})
+        for _ in range(3):
+            get_json("http://a.io", session)
+        self.assertEqual(session.get.call_count, 3)
+
+
+class TestAsyncCoalescing(unittest.IsolatedAsyncioTestCase):
+    """Test case for sharing identical in-flight `async_get_json` calls."""
+
+    async def test_awaiters_share_request(self) -> None:
+        """Test concurrent awaiters of one URL share a single request."""
+        session = Mock(**{
+            'get.return_value': make_response(200, b'{"v": 1}'),
+        })
+        before = coalescing_stats()
+        results = await asyncio.gather(*(
+            async_get_json("http://a.io", session) for _ in range(3)
+        ))
+        self.assertEqual(results, [{"v": 1}] * 3)
+        session.get.assert_called_once_with("http://a.io")
+        self.assertEqual(
+            coalescing_stats()["coalesced"] - before["coalesced"], 2)
+
+    async def test_event_loops_apart(self) -> None:
+        """Test awaiters in other event loops never join this loop's task.
+
+        Asserts:
+            Two threads each running their own loop send one request
+            apiece while both are in flight, and neither fails.
+        """
+        both_in_flight = threading.Barrier(2, timeout=5)
+
+        def get(url, **kwargs):
+            both_in_flight.wait()
+            return make_response(200, b'{"v": 1}')
+
+        session = Mock(**{'get.side_effect': get})
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(asyncio.run(
+                async_get_json("http://a.io", session))))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [{"v": 1}] * 2)
+        self.assertEqual(session.get.call_count, 2)
+
+
+class TestMetrics(unittest.TestCase):
+    """Test case for the `METRICS` instrumentation registry."""
+
+    def setUp(self) -> None:
+        """Start each test with an empty, enabled registry."""
+        METRICS.reset()
+        enable_metrics()
+
+    def tearDown(self) -> None:
+        """Disable and empty the registry."""
+        enable_metrics(False)
+        METRICS.reset()
+
+    def test_records_requests_and_caches(self) -> None:
+        """Test requests, decoding, and cache outcomes are recorded.
+
+        Asserts:
+            Latency, bytes and status are labelled by URL, and hit ratios
+            are derived for the response cache and memoize.
+        """
+        url = "http://a.io"
+        session = Mock(**{'get.side_effect': [
+            make_response(200, b'{"v": 1}', {"ETag": "x"}),
+            make_response(304),
+        ]})
+
+        class TestClass:
+            """Class with a memoized property."""
+
+            @memoize
+            def a_property(self):
+                """Fetch through the instrumented `get_json`."""
+                return get_json(url, session, cache)
+
+        cache = LRUCache()
+        instance = TestClass()
+        instance.a_property
+        instance.a_property
+        get_json(url, session, cache)
+        metrics = METRICS.as_dict()
+        self.assertEqual(metrics["counters"]["http_requests_total"], {
+            '{status="200",url="http://a.io"}': 1,
+            '{status="304",url="http://a.io"}': 1,
+        })
+        self.assertEqual(
+            metrics["counters"]["http_response_bytes_total"],
+            {'{url="http://a.io"}': 8},
+        )
+        latency = metrics["histograms"]["http_request_seconds"]
+        self.assertEqual(latency['{url="http://a.io"}']["count"], 2)
+        decode = metrics["histograms"]["json_decode_seconds"]
+        self.assertEqual(sum(h["count"] for h in decode.values()), 2)
+        self.assertEqual(metrics["cache_hit_ratio"],
+                         {"response": 0.5, "memoize": 0.5})
+
+    def test_prometheus(self) -> None:
+        """Test the Prometheus text export of counters and histograms."""
+        METRICS.inc("requests_total", 2, url='a"b')
+        METRICS.observe("latency_seconds", 0.02)
+        METRICS.observe("latency_seconds", 20)
+        text = METRICS.to_prometheus().splitlines()
+        self.assertEqual(text[:2], [
+            "# TYPE requests_total counter",
+            'requests_total{url="a\\"b"} 2',
+        ])
+        self.assertIn('latency_seconds_bucket{le="0.01"} 0', text)
+        self.assertIn('latency_seconds_bucket{le="0.025"} 1', text)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 2', text)
+        self.assertIn("latency_seconds_sum 20.02", text)
+        self.assertIn("latency_seconds_count 2", text)
+
+    def test_disabled(self) -> None:
+        """Test nothing is recorded while metrics are disabled."""
+        enable_metrics(False)
+        METRICS.inc("requests_total")
+        METRICS.observe("latency_seconds", 1)
+        self.assertEqual(METRICS.as_dict(), {
+            "counters": {}, "histograms": {}, "cache_hit_ratio": {},
+        })
+
+
+class TestSession(unittest.TestCase):
+    """Test case for the shared pooled session helpers."""
+
+    def tearDown(self) -> None:
+        """Drop any session installed by a test."""
+        set_session(None)
+
+    def test_get_session_is_shared(self) -> None:
+        """Test `get_session` builds one session and reuses it."""
+        set_session(None)
+        self.assertIs(get_session(), get_session())
+
+    def test_make_session_pool(self) -> None:
+        """Test `make_session` mounts an adapter with the given pool sizes."""
+        session = make_session(pool_connections=3, pool_maxsize=7)
+        adapter = session.get_adapter("https://api.github.com")
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        set_session(session)
+        self.assertIs(get_session(), session)
+
+
+class TestIterJsonPages(unittest.TestCase):
+    """Test case for the `iter_json_pages` function.
+
+    This class tests that `iter_json_pages` follows `Link: rel="next"`
+    headers and yields one payload per page.
+    """
+
+    def test_iter_json_pages(self) -> None:
+        """Test `iter_json_pages` follows pagination links lazily.
+
+        Asserts:
+            Each page payload is yielded in order and a page is
+            only requested for a page once the previous one was consumed.
+        """
+        next_url = "http://example.com/repos?page=2"
+        responses = [
+            Mock(**{
+                "content": b"[1, 2]",
+                "links": {"next": {"url": next_url}},
+            }),
+            Mock(**{"content": b"[3]", "links": {}}),
+        ]
+        with patch(
+            'utils.get_session',
+            return_value=Mock(**{'get.side_effect': responses})
+        ) as get_session:
+            req_get = get_session.return_value.get
+            pages = iter_json_pages("http://example.com/repos")
+            self.assertEqual(next(pages), [1, 2])
+            req_get.assert_called_once_with("http://example.com/repos")
+            self.assertEqual(list(pages), [[3]])
+            req_get.assert_called_with(next_url)
+
+
+class TestPageLinks(unittest.TestCase):
+    """Test case for the `with_page` and `last_page_number` helpers."""
+
+    @parameterized.expand([
+        ("http://a.io/r", 2, "http://a.io/r?page=2"),
+        ("http://a.io/r?per_page=5&page=1", 4,
+         "http://a.io/r?per_page=5&page=4"),
+    ])
+    def test_with_page(self, url: str, page: int, expected: str) -> None:
+        """Test `with_page` sets or replaces the `page` query parameter."""
+        self.assertEqual(with_page(url, page), expected)
+
+    @parameterized.expand([
+        ({}, 1),
+        ({"next": {"url": "http://a.io/r?page=2"}}, 1),
+        ({"last": {"url": "http://a.io/r?per_page=5&page=7"}}, 7),
+    ])
+    def test_last_page_number(self, links: Dict, expected: int) -> None:
+        """Test `last_page_number` reads the page of the `last` relation."""
+        self.assertEqual(last_page_number(links), expected)
 
 
 class TestMemoize(unittest.TestCase):
@@ -155,6 +784,189 @@ class TestMemoize(unittest.TestCase):
             # Ensure that `a_method` was called only once
             mock_method.assert_called_once()
 
+    def test_memoize_ttl(self) -> None:
+        """Test `memoize(ttl=...)` recomputes once the entry has expired."""
+
+        class TestClass:
+            """Class with a memoized property expiring after 10 seconds."""
+            calls = 0
+
+            @memoize(ttl=10)
+            def a_property(self):
+                """Count and return the number of computations."""
+                TestClass.calls += 1
+                return TestClass.calls
+
+        instance = TestClass()
+        with patch('utils.time.monotonic', return_value=100.0) as clock:
+            self.assertEqual(instance.a_property, 1)
+            clock.return_value = 109.0
+            self.assertEqual(instance.a_property, 1)
+            clock.return_value = 110.0
+            self.assertEqual(instance.a_property, 2)
+        self.assertEqual(
+            (TestClass.a_property.hits, TestClass.a_property.misses), (1, 2)
+        )
+
+    def test_memoize_maxsize_and_invalidate(self) -> None:
+        """Test `memoize(maxsize=...)` bounds instances and can be reset.
+
+        Asserts:
+            Only the most recently used instances keep a result, and both
+            `del instance.attr` and `invalidate` force a recompute.
+        """
+        method = Mock(return_value=42)
+
+        class TestClass:
+            """Class whose memoized property is kept for 2 instances."""
+
+            @memoize(maxsize=2)
+            def a_property(self):
+                """Return the result of the shared mock."""
+                return method()
+
+        first, second, third = TestClass(), TestClass(), TestClass()
+        for instance in (first, second, third, third):
+            instance.a_property
+        self.assertEqual(method.call_count, 3)
+        first.a_property
+        self.assertEqual(method.call_count, 4)
+        del third.a_property
+        third.a_property
+        TestClass.a_property.invalidate(third)
+        third.a_property
+        self.assertEqual(method.call_count, 6)
+        with self.assertRaises(AttributeError):
+            third.a_property = 1
+
+    def test_memoize_frees_instance(self) -> None:
+        """Test a result referring back to its instance does not keep the
+        instance alive, with or without ``maxsize``.
+        """
+
+        class TestClass:
+            """Class whose memoized properties hold the instance."""
+
+            @memoize
+            def a_property(self):
+                """Return a list holding the instance."""
+                return [self]
+
+            @memoize(ttl=60, maxsize=2)
+            def b_property(self):
+                """Return a list holding the instance."""
+                return [self]
+
+        instance = TestClass()
+        instance.a_property
+        instance.b_property
+        ref = weakref.ref(instance)
+        del instance
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(len(TestClass.b_property._instances), 0)
+
+    def test_memoize_single_flight(self) -> None:
+        """Test concurrent threads share a single in-flight evaluation.
+
+        Asserts:
+            The wrapped method runs once although every thread missed the
+            cache while it was computing, and all threads get its result.
+        """
+        started = threading.Event()
+        release = threading.Event()
+        method = Mock(return_value=42)
+
+        class TestClass:
+            """Class whose memoized property blocks until released."""
+
+            @memoize
+            def a_property(self):
+                """Block, then return the result of the shared mock."""
+                started.set()
+                release.wait()
+                return method()
+
+        instance = TestClass()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                instance.a_property))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        started.wait()
+        release.set()
+        for thread in threads:
+            thread.join()
+        method.assert_called_once()
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(TestClass.a_property._flights, {})
+
+
+class TestAsyncMemoize(unittest.IsolatedAsyncioTestCase):
+    """Test case for the `async_memoize` decorator."""
+
+    async def test_async_memoize(self) -> None:
+        """Test concurrent awaiters share one evaluation.
+
+        Asserts:
+            A failed evaluation is not cached, and once it succeeds later
+            calls are served from cache.
+        """
+        method = Mock(side_effect=[ValueError, 42])
+
+        class TestClass:
+            """Class with a memoized coroutine method."""
+
+            @async_memoize
+            async def a_method(self):
+                """Yield to the loop, then return the shared mock result."""
+                await asyncio.sleep(0)
+                return method()
+
+        instance = TestClass()
+        with self.assertRaises(ValueError):
+            await asyncio.gather(instance.a_method(), instance.a_method())
+        self.assertEqual(
+            await asyncio.gather(instance.a_method(), instance.a_method()),
+            [42, 42],
+        )
+        self.assertEqual(await instance.a_method(), 42)
+        self.assertEqual(method.call_count, 2)
+
+    async def test_event_loops_apart(self) -> None:
+        """Test a task pending in one event loop is not awaited from
+        another, and the result is cached once either finishes.
+        """
+        both_started = threading.Barrier(2, timeout=5)
+        method = Mock(return_value=42)
+
+        class TestClass:
+            """Class with a memoized coroutine method."""
+
+            @async_memoize
+            async def a_method(self):
+                """Wait for the other loop's call, then return 42."""
+                await asyncio.to_thread(both_started.wait)
+                return method()
+
+        instance = TestClass()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                asyncio.run(instance.a_method())))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [42, 42])
+        self.assertEqual(await instance.a_method(), 42)
+        self.assertEqual(method.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,20 +1,70 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import asyncio
+import codecs
+import json
+import re
 import requests
-from functools import wraps
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import closing
+from functools import lru_cache, partial, wraps
+from itertools import chain
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from typing import (
+    Awaitable,
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
 )
 
 __all__ = [
+    "CachedResponse",
+    "LRUCache",
+    "METRICS",
+    "Metrics",
+    "Record",
+    "SingleFlight",
     "access_nested_map",
+    "async_get_json",
+    "async_get_json_page",
+    "async_memoize",
+    "coalescing_stats",
+    "compile_path",
+    "enable_metrics",
+    "extract_paths",
     "get_json",
+    "get_json_page",
+    "get_session",
+    "get_json_backend",
+    "iter_json_array",
+    "iter_json_pages",
+    "last_page_number",
+    "make_record_type",
+    "make_session",
     "memoize",
+    "set_coalescing",
+    "set_json_backend",
+    "set_response_cache",
+    "set_scheduler",
+    "set_session",
+    "stream_json_array",
+    "with_page",
 ]
 
 
@@ -40,15 +90,1170 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
-def get_json(url: str) -> Dict:
+_MISSING = object()
+
+
+def compile_path(path: Sequence, default: Any = _MISSING) -> Callable:
+    """Compile a key path into a getter equivalent to `access_nested_map`.
+    The path is resolved once, and the getter returns ``default`` instead
+    of raising KeyError when given one, so hot loops need no try/except.
+    Parameters
+    ----------
+    path: Sequence
+        a sequence of key representing a path to the value
+    default: Any
+        value returned when the path does not resolve
+    Example
+    -------
+    >>> license_key = compile_path(("license", "key"), default=None)
+    >>> license_key({"license": {"key": "mit"}})
+    'mit'
+    >>> license_key({"license": None}) is None
+    True
+    """
+    keys = tuple(path)
+
+    def getter(nested_map: Mapping) -> Any:
+        """Access the compiled path in ``nested_map``"""
+        value = nested_map
+        for key in keys:
+            if type(value) is not dict and not isinstance(value, Mapping):
+                break
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                break
+        else:
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    return getter
+
+
+def extract_paths(
+    records: Iterable[Mapping],
+    paths: Iterable[Union[str, Sequence]],
+    default: Any = None,
+) -> Dict[Union[str, tuple], List]:
+    """Extract several key paths from every record in a single pass.
+    Paths are dotted strings or key sequences; missing values become
+    ``default``. Returns one column (list) per path, keyed by the path
+    as given (sequences as tuples).
+    Example
+    -------
+    >>> repos = [{"name": "a", "license": {"key": "mit"}}, {"name": "b"}]
+    >>> extract_paths(repos, ["name", "license.key"])
+    {'name': ['a', 'b'], 'license.key': ['mit', None]}
+    """
+    columns: Dict[Union[str, tuple], List] = {}
+    extractors = []
+    for path in paths:
+        if isinstance(path, str):
+            key, keys = path, path.split(".")
+        else:
+            key = keys = tuple(path)
+        columns[key] = []
+        extractors.append(
+            (columns[key].append, compile_path(keys, default=default)))
+    for record in records:
+        for append, getter in extractors:
+            append(getter(record))
+    return columns
+
+
+class Record(Mapping):
+    """Base of the compact read-only records built by `make_record_type`.
+    Fields live in ``__slots__`` instead of a per-record dict; fields
+    absent from the source mapping are absent from the record too.
+    """
+    __slots__ = ()
+    _nested: Dict[str, type] = {}
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "Record":
+        """Project ``data`` onto the fields of this record type"""
+        record = cls.__new__(cls)
+        for field in cls.__slots__:
+            value = data.get(field, _MISSING)
+            if value is _MISSING:
+                continue
+            nested = cls._nested.get(field)
+            if nested is not None and isinstance(value, Mapping):
+                value = nested.from_mapping(value)
+            object.__setattr__(record, field, value)
+        return record
+
+    def __getitem__(self, key: Any) -> Any:
+        """Value of field ``key``"""
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Names of the fields present"""
+        return (field for field in self.__slots__ if hasattr(self, field))
+
+    def __len__(self) -> int:
+        """Number of fields present"""
+        return sum(1 for _ in self)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Records are read-only"""
+        raise AttributeError("can't set attribute")
+
+    def __repr__(self) -> str:
+        """Show the record like a dict"""
+        return "{}({})".format(type(self).__name__, dict(self))
+
+
+@lru_cache(maxsize=None)
+def make_record_type(name: str, fields: Tuple[str, ...]) -> type:
+    """Build a `Record` subclass keeping only the dotted ``fields``.
+    Example
+    -------
+    >>> Repo = make_record_type("Repo", ("name", "license.key"))
+    >>> Repo.from_mapping({"name": "a", "id": 1, "license": {"key": "mit",
+    ...                                                   "name": "MIT"}})
+    Repo({'name': 'a', 'license': Repo_license({'key': 'mit'})})
+    """
+    subfields: Dict[str, List[str]] = {}
+    whole = set()
+    for path in fields:
+        head, _, rest = path.partition(".")
+        subfields.setdefault(head, [])
+        if rest:
+            subfields[head].append(rest)
+        else:
+            whole.add(head)
+    nested = {
+        head: make_record_type("{}_{}".format(name, head), tuple(rest))
+        for head, rest in subfields.items() if rest and head not in whole
+    }
+    return type(name, (Record,), {
+        "__slots__": tuple(subfields),
+        "_nested": nested,
+    })
+
+
+def make_session(
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+) -> requests.Session:
+    """Build a keep-alive session with a tunable connection pool.
+    Parameters
+    ----------
+    pool_connections: int
+        number of per-host connection pools to keep
+    pool_maxsize: int
+        maximum number of connections kept alive per host
+    pool_block: bool
+        block instead of opening extra connections once a host's pool
+        is exhausted, making ``pool_maxsize`` a hard per-host limit
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Return the shared session, creating it on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def set_session(session: Optional[requests.Session]) -> None:
+    """Replace the shared session used when no session is injected.
+    Passing ``None`` makes the next call build a fresh default one.
+    """
+    global _session
+    with _session_lock:
+        _session = session
+
+
+class LRUCache:
+    """A thread-safe mapping that evicts its least recently used entry
+    once it holds more than ``maxsize`` entries (unbounded when None),
+    and forgets entries older than ``ttl`` seconds (never when None).
+    Lookups are tallied in ``hits`` and ``misses``.
+    """
+
+    def __init__(self, maxsize: Optional[int] = None,
+                 ttl: Optional[float] = None) -> None:
+        """Init method of LRUCache"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the value for ``key`` and mark it as recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                del self._data[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def peek(self, key: Any, default: Any = None) -> Any:
+        """Return the value for ``key`` without counting or reordering"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return default
+            return entry[0]
+
+    def set(self, key: Any, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting the oldest entries"""
+        expires = float("inf")
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Any) -> None:
+        """Drop ``key`` if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Any) -> bool:
+        """Whether ``key`` holds an unexpired entry, without touching it"""
+        entry = self._data.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self) -> int:
+        """Number of entries"""
+        return len(self._data)
+
+
+class SingleFlight:
+    """Share one evaluation among concurrent callers of the same key.
+    ``calls`` counts evaluations and ``saved`` the callers that joined
+    one already in flight instead of starting their own.
+    """
+
+    def __init__(self) -> None:
+        """Init method of SingleFlight"""
+        self.calls = 0
+        self.saved = 0
+        self._inflight: Dict[Any, Future] = {}
+        self._tasks: Dict[Any, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    def call(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Return ``fn()``, or wait for the result of the thread already
+        evaluating ``key`` and share its value or exception
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+                self.calls += 1
+            else:
+                self.saved += 1
+        if not leader:
+            return future.result()
+        try:
+            value = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return value
+
+    async def acall(self, key: Any, fn: Callable[[], Awaitable]) -> Any:
+        """Await ``fn()``, or join the task already awaiting ``key`` in
+        the running event loop; tasks are never shared across loops
+        """
+        key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(partial(self._land, key))
+                self.calls += 1
+            else:
+                self.saved += 1
+        return await asyncio.shield(task)
+
+    def _land(self, key: Any, task: asyncio.Future) -> None:
+        """Forget the finished task of ``key``"""
+        with self._lock:
+            self._tasks.pop(key, None)
+
+
+# ``result`` labels of ``*_cache_total`` lookups served from cache
+_HIT_RESULTS = ("hit", "fresh")
+
+
+class Metrics:
+    """Registry of counters and histograms describing client activity.
+    Recording is a no-op while ``enabled`` is False, so instrumented
+    paths only pay for one attribute check. Export with `as_dict` or
+    `to_prometheus`.
+    Example
+    -------
+    >>> enable_metrics()
+    >>> payload = get_json("https://api.github.com/orgs/google")
+    >>> METRICS.as_dict()["counters"]["http_requests_total"]
+    {'{status="200",url="https://api.github.com/orgs/google"}': 1}
+    """
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+               5.0, 10.0)
+
+    def __init__(self) -> None:
+        """Init method of Metrics"""
+        self.enabled = False
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop every recorded value"""
+        with self._lock:
+            self._counters: Dict[str, Dict[tuple, float]] = {}
+            self._histograms: Dict[str, Dict[tuple, List[float]]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Add ``value`` to counter ``name``"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record ``value`` in histogram ``name``"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0.0] * (len(self.BUCKETS) + 2)
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Snapshot of every series, with hit ratios of the
+        ``*_cache_total`` counters: lookups labelled ``result="hit"``
+        (revalidated) or ``result="fresh"`` (served without a request)
+        over all lookups
+        """
+        with self._lock:
+            counters = {
+                name: {_label_text(key): value
+                       for key, value in series.items()}
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: {_label_text(key): {
+                    "buckets": dict(zip(self.BUCKETS, counts)),
+                    "sum": counts[-2],
+                    "count": counts[-1],
+                } for key, counts in series.items()}
+                for name, series in self._histograms.items()
+            }
+            ratios = {}
+            for name, series in self._counters.items():
+                if name.endswith("_cache_total"):
+                    hits = sum(value for key, value in series.items()
+                               if dict(key).get("result") in _HIT_RESULTS)
+                    total = sum(series.values())
+                    ratios[name[:-len("_cache_total")]] = hits / total
+        return {"counters": counters, "histograms": histograms,
+                "cache_hit_ratio": ratios}
+
+    def to_prometheus(self) -> str:
+        """Every series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append("# TYPE {} counter".format(name))
+                for key, value in series.items():
+                    lines.append("{}{} {}".format(
+                        name, _label_text(key), _number(value)))
+            for name, series in sorted(self._histograms.items()):
+                lines.append("# TYPE {} histogram".format(name))
+                for key, counts in series.items():
+                    bounds = [_number(b) for b in self.BUCKETS] + ["+Inf"]
+                    for bound, count in zip(
+                            bounds, counts[:-2] + [counts[-1]]):
+                        lines.append("{}_bucket{} {}".format(
+                            name, _label_text(key + (("le", bound),)),
+                            _number(count)))
+                    lines.append("{}_sum{} {}".format(
+                        name, _label_text(key), _number(counts[-2])))
+                    lines.append("{}_count{} {}".format(
+                        name, _label_text(key), _number(counts[-1])))
+        return "\n".join(lines) + "\n"
+
+
+def _label_text(labels: tuple) -> str:
+    """Render label pairs as ``{name="value",...}``"""
+    if not labels:
+        return ""
+    return "{" + ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\")
+                         .replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels
+    ) + "}"
+
+
+def _number(value: float) -> str:
+    """Render a sample value without a needless fractional part"""
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+METRICS = Metrics()
+
+
+def enable_metrics(enabled: bool = True) -> None:
+    """Start (or stop) recording into `METRICS`.
+    """
+    METRICS.enabled = enabled
+
+
+class CachedResponse(NamedTuple):
+    """A response body stored with the headers needed to revalidate it.
+    A cache returns it with ``fresh`` set when it may be served without
+    revalidating (e.g. `sqlite_cache.SQLiteCache` within its ``ttl``).
+    """
+    body: bytes
+    headers: Dict[str, str]
+    fresh: bool = False
+
+    CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+    @classmethod
+    def from_response(
+        cls,
+        response: requests.Response,
+    ) -> Optional["CachedResponse"]:
+        """Snapshot ``response``, or None when it carries no validator"""
+        if response.status_code != 200:
+            return None
+        headers = {
+            name: response.headers[name] for name in cls.CACHED_HEADERS
+            if name in response.headers
+        }
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return None
+        return cls(response.content, headers)
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this response"""
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def to_response(self, url: str) -> requests.Response:
+        """Rebuild a ``200 OK`` response serving the stored body"""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response._content_consumed = True
+        return response
+
+
+_response_cache: Optional[LRUCache] = None
+
+
+def set_response_cache(cache: Optional[LRUCache]) -> None:
+    """Install the response cache used when no cache is passed explicitly.
+    Any object with ``get(url)`` and ``set(url, CachedResponse)`` works,
+    such as `sqlite_cache.SQLiteCache` to persist across restarts;
+    ``None`` disables conditional requests.
+    Example
+    -------
+    >>> set_response_cache(LRUCache(maxsize=512))
+    """
+    global _response_cache
+    _response_cache = cache
+
+
+_scheduler = None
+
+
+def set_scheduler(scheduler: Any) -> None:
+    """Install the scheduler every request goes through.
+    A scheduler's ``send(request)`` calls ``request()`` when allowed and
+    returns its response, such as `rate_limit.RateLimitScheduler`;
+    ``None`` sends requests immediately.
+    """
+    global _scheduler
+    _scheduler = scheduler
+
+
+_requests = SingleFlight()
+_coalescing = True
+
+
+def set_coalescing(enabled: bool) -> None:
+    """Turn sharing of identical in-flight requests on or off.
+    """
+    global _coalescing
+    _coalescing = enabled
+
+
+def coalescing_stats() -> Dict[str, int]:
+    """Requests sent, and requests saved by joining one in flight.
+    """
+    return {"requests": _requests.calls, "coalesced": _requests.saved}
+
+
+def _get(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    stream: bool = False,
+) -> requests.Response:
+    """GET ``url``, revalidating against the response cache if any.
+    A ``304 Not Modified`` answer is served from the cached body. With
+    ``stream`` the body is left unread; streamed responses revalidate
+    cached entries but are not stored, as that would buffer the body.
+    Concurrent non-streamed GETs of the same URL through the same
+    session share one request and response.
+    """
+    session = session or get_session()
+    if stream or not _coalescing:
+        return _send(url, session, cache, stream)
+    return _requests.call(
+        (url, session), partial(_send, url, session, cache, stream))
+
+
+async def _async_get(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+) -> requests.Response:
+    """`_get` for coroutines: concurrent awaiters of the same URL share
+    one request, sent from a worker thread
+    """
+    session = session or get_session()
+    fetch = partial(asyncio.to_thread, _send, url, session, cache, False)
+    if not _coalescing:
+        return await fetch()
+    return await _requests.acall((url, session), fetch)
+
+
+def _record_response(url: str, response: requests.Response,
+                     elapsed: float, caching: bool, revalidated: bool,
+                     stream: bool) -> None:
+    """Record the latency, size and cache outcome of a response"""
+    METRICS.observe("http_request_seconds", elapsed, url=url)
+    METRICS.inc("http_requests_total", url=url,
+                status=str(response.status_code))
+    if stream:
+        size = int(response.headers.get("Content-Length", 0))
+    else:
+        size = len(response.content or b"")
+    METRICS.inc("http_response_bytes_total", size, url=url)
+    if caching:
+        result = "miss"
+        if revalidated:
+            result = "hit" if response.status_code == 304 else "stale"
+        METRICS.inc("response_cache_total", result=result)
+
+
+def _send(
+    url: str,
+    session: requests.Session,
+    cache: Optional[LRUCache],
+    stream: bool,
+) -> requests.Response:
+    """Send the GET of `_get` through the response cache and scheduler"""
+    cache = cache if cache is not None else _response_cache
+    kwargs: Dict[str, Any] = {"stream": True} if stream else {}
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None and cached.fresh:
+        if METRICS.enabled:
+            METRICS.inc("response_cache_total", result="fresh")
+        return cached.to_response(url)
+    if cached is not None:
+        kwargs["headers"] = cached.validators()
+    request = partial(session.get, url, **kwargs)
+    scheduler = _scheduler
+    if METRICS.enabled:
+        start = time.perf_counter()
+    response = request() if scheduler is None else scheduler.send(request)
+    if METRICS.enabled:
+        _record_response(url, response, time.perf_counter() - start,
+                         cache is not None, cached is not None, stream)
+    if cached is not None and response.status_code == 304:
+        response.close()
+        cache.set(url, cached)
+        return cached.to_response(url)
+    if cache is not None and not stream:
+        fresh = CachedResponse.from_response(response)
+        if fresh is not None:
+            cache.set(url, fresh)
+    return response
+
+
+def _load_json_backends() -> "OrderedDict[str, Callable[[bytes], Any]]":
+    """Decoders of the installed JSON libraries, fastest first; each
+    takes the raw response bytes, skipping a separate text decode
+    """
+    backends: "OrderedDict[str, Callable[[bytes], Any]]" = OrderedDict()
+    try:
+        import orjson
+        backends["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import msgspec
+        backends["msgspec"] = msgspec.json.decode
+    except ImportError:
+        pass
+    try:
+        import ujson
+        backends["ujson"] = ujson.loads
+    except ImportError:
+        pass
+    backends["json"] = json.loads
+    return backends
+
+
+JSON_BACKENDS = _load_json_backends()
+_json_backend = next(iter(JSON_BACKENDS))
+_json_loads = JSON_BACKENDS[_json_backend]
+
+
+def get_json_backend() -> str:
+    """Name of the JSON library decoding responses"""
+    return _json_backend
+
+
+def set_json_backend(name: str) -> None:
+    """Decode responses with the installed JSON library ``name``, one of
+    ``JSON_BACKENDS`` ("orjson", "msgspec", "ujson" or "json").
+    """
+    global _json_backend, _json_loads
+    if name not in JSON_BACKENDS:
+        raise ValueError("JSON backend {!r} is not installed".format(name))
+    _json_backend, _json_loads = name, JSON_BACKENDS[name]
+
+
+def _record_type(fields: Union[Iterable[str], type]) -> type:
+    """The `Record` subclass of ``fields``, given as dotted field names or
+    as a `Record` subclass
+    """
+    if isinstance(fields, type) and issubclass(fields, Record):
+        return fields
+    return make_record_type("Record", tuple(sorted(set(fields))))
+
+
+def _projector(fields: Union[Iterable[str], type]) -> Callable:
+    """Return the function projecting a decoded value onto ``fields``"""
+    return _record_type(fields).from_mapping
+
+
+@lru_cache(maxsize=None)
+def _struct_decoder(record_type: type) -> Optional[Callable[[bytes], Any]]:
+    """A msgspec decoder of a ``record_type`` object, or an array of them,
+    that skips every other field while parsing; None without msgspec
+    """
+    try:
+        import msgspec
+    except ImportError:
+        return None
+
+    def struct_type(record_type: type) -> Tuple[type, Callable]:
+        """The struct of ``record_type`` and its conversion to a record"""
+        fields, nested = [], {}
+        for field in record_type.__slots__:
+            kind: Any = Any
+            if field in record_type._nested:
+                struct, nested[field] = struct_type(
+                    record_type._nested[field])
+                kind = Union[struct, None, msgspec.UnsetType]
+            fields.append((field, kind, msgspec.UNSET))
+        struct = msgspec.defstruct(record_type.__name__, fields)
+        unset = msgspec.UNSET
+
+        def to_record(value: Any) -> Record:
+            """Copy the fields set in struct ``value`` into a record"""
+            record = record_type.__new__(record_type)
+            for field in record_type.__slots__:
+                item = getattr(value, field)
+                if item is unset:
+                    continue
+                if item is not None and field in nested:
+                    item = nested[field](item)
+                object.__setattr__(record, field, item)
+            return record
+
+        return struct, to_record
+
+    struct, to_record = struct_type(record_type)
+    decoder = msgspec.json.Decoder(Union[List[struct], struct])
+
+    def decode(body: bytes) -> Any:
+        """Decode ``body`` into records, or raise ValueError"""
+        value = decoder.decode(body)
+        if isinstance(value, list):
+            return [to_record(element) for element in value]
+        return to_record(value)
+
+    return decode
+
+
+def _decode(body: bytes, fields: Union[Iterable[str], type] = None) -> Any:
+    """Decode a JSON body, projecting it onto ``fields`` if given.
+    With msgspec installed, a projected body is decoded into structs of
+    the wanted fields only, so the others are never built; otherwise,
+    or when the body does not fit those structs, it is decoded whole
+    with the selected backend and projected afterwards.
+    """
+    if METRICS.enabled:
+        start = time.perf_counter()
+    backend = _json_backend
+    if fields is None:
+        value = _json_loads(body)
+    else:
+        record_type = _record_type(fields)
+        decode = _struct_decoder(record_type)
+        value = _MISSING
+        if decode is not None:
+            try:
+                value, backend = decode(body), "msgspec"
+            except ValueError:
+                pass
+        if value is _MISSING:
+            value = _json_loads(body)
+            if isinstance(value, list):
+                value = [record_type.from_mapping(element)
+                         for element in value]
+            else:
+                value = record_type.from_mapping(value)
+    if METRICS.enabled:
+        METRICS.observe("json_decode_seconds", time.perf_counter() - start,
+                        backend=backend)
+    return value
+
+
+def get_json(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    fields: Union[Iterable[str], type] = None,
+) -> Dict:
     """Get JSON from remote URL.
+    With ``fields`` (e.g. ``{"name", "license.key"}``), objects are
+    returned as compact `Record` instances of those fields only.
     """
-    response = requests.get(url)
-    return response.json()
+    return _decode(_get(url, session=session, cache=cache).content, fields)
 
 
-def memoize(fn: Callable) -> Callable:
+def get_json_page(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    fields: Union[Iterable[str], type] = None,
+) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+    """Get JSON and the parsed ``Link`` header relations from remote URL.
+    Example
+    -------
+    >>> payload, links = get_json_page("https://api.github.com/orgs/x/repos")
+    >>> links["next"]["url"]
+    'https://api.github.com/organizations/1/repos?page=2'
+    """
+    response = _get(url, session=session, cache=cache)
+    return _decode(response.content, fields), response.links
+
+
+async def async_get_json(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    fields: Union[Iterable[str], type] = None,
+) -> Dict:
+    """Get JSON from remote URL without blocking the event loop.
+    """
+    response = await _async_get(url, session=session, cache=cache)
+    return _decode(response.content, fields)
+
+
+async def async_get_json_page(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    fields: Union[Iterable[str], type] = None,
+) -> Tuple[Any, Dict[str, Dict[str, str]]]:
+    """`get_json_page` without blocking the event loop.
+    """
+    response = await _async_get(url, session=session, cache=cache)
+    return _decode(response.content, fields), response.links
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_CHUNK_SIZE = 64 * 1024
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array from UTF-8 chunks.
+    Each element is yielded as soon as it has been fully received, so
+    only one element and one chunk are buffered at a time.
+    Example
+    -------
+    >>> list(iter_json_array([b'[{"name": "a"}, {"na', b'me": "b"}]']))
+    [{'name': 'a'}, {'name': 'b'}]
+    """
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    scan = json.JSONDecoder().raw_decode
+    buffer, pos, state = "", 0, "start"
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        buffer = buffer[pos:] + decode(b"" if final else chunk, final)
+        pos = 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if state == "start" and char == "[":
+                state = "first"
+            elif state in ("first", "separator") and char == "]":
+                state = "done"
+            elif state == "separator" and char == ",":
+                state = "value"
+            elif state in ("first", "value"):
+                try:
+                    value, end = scan(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                # a value ending the buffer, or a number whose next
+                # character could extend it, may continue in the next chunk
+                if not final and (end == len(buffer) or (
+                        buffer[end] in _NUMBER_CHARS
+                        and isinstance(value, (int, float)))):
+                    break
+                yield value
+                pos, state = end, "separator"
+                continue
+            else:
+                raise json.JSONDecodeError(
+                    "Unexpected character in JSON array", buffer, pos)
+            pos += 1
+    if state != "done":
+        raise json.JSONDecodeError("Truncated JSON array", buffer, pos)
+
+
+def stream_json_array(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    fields: Union[Iterable[str], type] = None,
+) -> Iterator[Any]:
+    """Yield the elements of the JSON array at URL while it downloads,
+    projected onto ``fields`` if given.
+    """
+    with closing(_get(url, session=session, cache=cache, stream=True)) as r:
+        elements = iter_json_array(r.iter_content(_CHUNK_SIZE))
+        if fields is not None:
+            elements = map(_projector(fields), elements)
+        yield from elements
+
+
+def iter_json_pages(
+    url: str,
+    session: requests.Session = None,
+    cache: LRUCache = None,
+    stream: bool = False,
+    fields: Union[Iterable[str], type] = None,
+) -> Iterator[Any]:
+    """Yield the JSON payload of every page of a paginated resource.
+    Pages are fetched lazily, following ``Link: rel="next"`` headers,
+    so only one page is held in memory at a time. With ``stream``, each
+    page is an iterator decoding its array elements as they arrive; it
+    must be consumed before the next page is requested. ``fields``
+    projects elements as for `get_json`.
+    """
+    while url:
+        if stream:
+            response = _get(url, session=session, cache=cache, stream=True)
+            with closing(response):
+                elements = iter_json_array(
+                    response.iter_content(_CHUNK_SIZE))
+                if fields is not None:
+                    elements = map(_projector(fields), elements)
+                yield elements
+            links = response.links
+        else:
+            payload, links = get_json_page(
+                url, session=session, cache=cache, fields=fields)
+            yield payload
+        url = links.get("next", {}).get("url")
+
+
+def with_page(url: str, page: int) -> str:
+    """Return ``url`` with its ``page`` query parameter set to ``page``.
+    Example
+    -------
+    >>> with_page("https://api.github.com/orgs/x/repos?per_page=100", 3)
+    'https://api.github.com/orgs/x/repos?per_page=100&page=3'
+    """
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "page"]
+    query.append(("page", str(page)))
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def last_page_number(links: Dict[str, Dict[str, str]]) -> int:
+    """Return the page number advertised by a ``rel="last"`` link.
+    A resource without a ``last`` relation fits on a single page.
+    """
+    url = links.get("last", {}).get("url")
+    if url is None:
+        return 1
+    return int(dict(parse_qsl(urlsplit(url).query)).get("page", 1))
+
+
+class _Memoized:
+    """Base of the memoizing descriptors.
+    As with a plain memoized property, an instance's result lives in its
+    ``__dict__`` (under ``_<name>``), so it goes away with the instance;
+    it is stored with its expiry time (``ttl``). With ``maxsize``, weak
+    references to the instances holding a result are kept in least
+    recently used order, and the results of the oldest ones are dropped.
+    """
+
+    def __init__(self, fn: Callable, ttl: Optional[float] = None,
+                 maxsize: Optional[int] = None) -> None:
+        """Init method of _Memoized"""
+        wraps(fn)(self)
+        self._fn = fn
+        self._attr = "_{}".format(fn.__name__)
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._instances: "OrderedDict[int, weakref.ref]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _lookup(self, obj: Any) -> Any:
+        """The unexpired result cached for ``obj``, or `_MISSING`"""
+        entry = obj.__dict__.get(self._attr)
+        if entry is None or entry[2] != self._generation or (
+                entry[1] is not None and entry[1] <= time.monotonic()):
+            return _MISSING
+        return entry[0]
+
+    def _store(self, obj: Any, value: Any) -> None:
+        """Cache ``value`` for ``obj``"""
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        obj.__dict__[self._attr] = (value, expires, self._generation)
+        if self.maxsize is not None:
+            self._track(obj)
+
+    def _track(self, obj: Any) -> None:
+        """Mark ``obj`` as the most recently used instance, dropping the
+        results of the least recently used ones beyond ``maxsize``
+        """
+        key = id(obj)
+        evicted = []
+        with self._lock:
+            ref = self._instances.get(key)
+            if ref is None or ref() is not obj:
+                self._instances[key] = weakref.ref(
+                    obj, partial(self._untrack, key))
+            self._instances.move_to_end(key)
+            while len(self._instances) > self.maxsize:
+                evicted.append(self._instances.popitem(last=False)[1]())
+        for victim in evicted:
+            if victim is not None:
+                victim.__dict__.pop(self._attr, None)
+
+    def _untrack(self, key: int, ref: weakref.ref) -> None:
+        """Forget a collected instance"""
+        with self._lock:
+            if self._instances.get(key) is ref:
+                del self._instances[key]
+
+    def _record(self, hit: bool) -> None:
+        """Count a lookup in ``hits``/``misses`` and `METRICS`"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if METRICS.enabled:
+            METRICS.inc("memoize_cache_total", method=self.__qualname__,
+                        result="hit" if hit else "miss")
+
+    def cached(self, obj: Any, default: Any = None) -> Any:
+        """Return the result cached for ``obj`` without computing it"""
+        value = self._lookup(obj)
+        return default if value is _MISSING else value
+
+    def invalidate(self, obj: Any = None) -> None:
+        """Drop the result cached for ``obj``, or for every instance"""
+        with self._lock:
+            if obj is None:
+                self._generation += 1
+                self._instances.clear()
+                return
+            self._instances.pop(id(obj), None)
+        obj.__dict__.pop(self._attr, None)
+
+
+class _MemoizedProperty(_Memoized):
+    """Read-only property caching the result of ``fn`` per instance.
+    Evaluation is single-flight: a miss takes a lock of its instance, so
+    threads that miss while another thread computes the same instance's
+    result wait for it instead of calling ``fn`` again (and retry if it
+    raised). Hits never take a lock.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Init method of _MemoizedProperty"""
+        super().__init__(*args, **kwargs)
+        # id(obj) -> lock of its evaluation in progress
+        self._flights: Dict[int, threading.Lock] = {}
+
+    def __get__(self, obj: Any, objtype: type = None) -> Any:
+        """Return the cached result, computing it on a miss"""
+        if obj is None:
+            return self
+        # lock-free hit path
+        entry = obj.__dict__.get(self._attr)
+        if entry is not None and entry[2] == self._generation and (
+                entry[1] is None or entry[1] > time.monotonic()):
+            self.hits += 1
+            if self.maxsize is not None:
+                self._track(obj)
+            if METRICS.enabled:
+                METRICS.inc("memoize_cache_total",
+                            method=self.__qualname__, result="hit")
+            return entry[0]
+        self._record(False)
+        return self._fill(obj)
+
+    def _fill(self, obj: Any) -> Any:
+        """Compute and cache the result of ``obj`` under its lock, unless
+        the thread that held the lock before already did
+        """
+        key = id(obj)
+        lock = threading.Lock()
+        # setdefault is atomic: every thread missing ``obj`` at once gets
+        # the lock of the first one
+        flight = self._flights.setdefault(key, lock)
+        try:
+            with flight:
+                value = self._lookup(obj)
+                if value is _MISSING:
+                    value = self._fn(obj)
+                    self._store(obj, value)
+                return value
+        finally:
+            if flight is lock:
+                del self._flights[key]
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        """Memoized properties are read-only"""
+        raise AttributeError("can't set attribute")
+
+    def __delete__(self, obj: Any) -> None:
+        """``del obj.attr`` invalidates the cached result"""
+        self.invalidate(obj)
+
+
+class _AsyncMemoizedMethod(_Memoized):
+    """Coroutine method whose result is computed once per instance.
+    The first call schedules a task that every concurrent awaiter in
+    the same event loop shares; a caller in another loop runs its own
+    evaluation while that task is pending. A failed task is forgotten so
+    the next call retries.
+    """
+
+    def __get__(self, obj: Any, objtype: type = None) -> Callable:
+        """Bind the memoized coroutine function to ``obj``"""
+        if obj is None:
+            return self
+        return partial(self._call, obj)
+
+    async def _call(self, obj: Any) -> Any:
+        """Await the shared task of ``obj``, starting it on a miss"""
+        task = self._lookup(obj)
+        if task is not _MISSING and not task.done() and \
+                task.get_loop() is not asyncio.get_running_loop():
+            task = _MISSING
+        self._record(task is not _MISSING)
+        if task is _MISSING:
+            task = asyncio.ensure_future(self._fn(obj))
+            task.add_done_callback(partial(self._discard_failed, obj))
+            self._store(obj, task)
+        elif self.maxsize is not None:
+            self._track(obj)
+        return await asyncio.shield(task)
+
+    def _discard_failed(self, obj: Any, task: asyncio.Future) -> None:
+        """Forget ``task`` if it did not produce a result"""
+        failed = task.cancelled() or task.exception() is not None
+        if failed and self._lookup(obj) is task:
+            self.invalidate(obj)
+
+
+def memoize(fn: Callable = None, *, ttl: Optional[float] = None,
+            maxsize: Optional[int] = None) -> Callable:
     """Decorator to memoize a method.
+    Used bare, results are kept for the lifetime of the instance; with
+    ``ttl`` they expire after that many seconds, and with ``maxsize`` at
+    most that many instances keep a result (least recently used first
+    out). ``del obj.attr`` or ``MyClass.attr.invalidate(obj)`` forces a
+    recompute; ``MyClass.attr.hits`` and ``.misses`` count lookups.
     Example
     -------
     class MyClass:
@@ -56,20 +1261,43 @@ def memoize(fn: Callable) -> Callable:
         def a_method(self):
             print("a_method called")
             return 42
+
+        @memoize(ttl=60, maxsize=128)
+        def b_method(self):
+            return 43
     >>> my_object = MyClass()
     >>> my_object.a_method
     a_method called
     42
     >>> my_object.a_method
     42
+    >>> del my_object.a_method
+    >>> my_object.a_method
+    a_method called
+    42
     """
-    attr_name = "_{}".format(fn.__name__)
+    if fn is None:
+        return lambda fn: _MemoizedProperty(fn, ttl=ttl, maxsize=maxsize)
+    return _MemoizedProperty(fn, ttl=ttl, maxsize=maxsize)
 
-    @wraps(fn)
-    def memoized(self):
-        """"memoized wraps"""
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
 
-    return property(memoized)
+def async_memoize(fn: Callable = None, *, ttl: Optional[float] = None,
+                  maxsize: Optional[int] = None) -> Callable:
+    """Decorator to memoize a coroutine method.
+    Concurrent awaiters of the same instance share a single evaluation;
+    ``ttl``, ``maxsize`` and invalidation behave as for `memoize`.
+    Example
+    -------
+    class MyClass:
+        @async_memoize
+        async def a_method(self):
+            print("a_method called")
+            return 42
+    >>> my_object = MyClass()
+    >>> await asyncio.gather(my_object.a_method(), my_object.a_method())
+    a_method called
+    [42, 42]
+    """
+    if fn is None:
+        return lambda fn: _AsyncMemoizedMethod(fn, ttl=ttl, maxsize=maxsize)
+    return _AsyncMemoizedMethod(fn, ttl=ttl, maxsize=maxsize)